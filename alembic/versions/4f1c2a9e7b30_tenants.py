@@ -0,0 +1,75 @@
+"""tenants
+
+Revision ID: 4f1c2a9e7b30
+Revises: 23ae27482e61
+Create Date: 2026-10-19 10:12:41.318205
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2a9e7b30'
+down_revision: Union[str, None] = '23ae27482e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TENANT_TABLES = ('works', 'site_settings', 'admin_users')
+
+
+def upgrade() -> None:
+    op.create_table('tenants',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('slug', sa.String(length=63), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('host', sa.String(length=255), nullable=True),
+    sa.Column('bucket_prefix', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug'),
+    sa.UniqueConstraint('host'),
+    )
+    # Existing data becomes the default tenant (empty bucket prefix: keys unchanged)
+    op.execute(
+        "INSERT INTO tenants (id, slug, name, bucket_prefix, is_active) "
+        "VALUES (1, 'default', '', '', true)"
+    )
+    op.execute("SELECT setval(pg_get_serial_sequence('tenants', 'id'), 1)")
+
+    for table in TENANT_TABLES:
+        op.add_column(table, sa.Column('tenant_id', sa.Integer(), server_default='1', nullable=False))
+        op.alter_column(table, 'tenant_id', server_default=None)
+        op.create_foreign_key(
+            f'{table}_tenant_id_fkey', table, 'tenants', ['tenant_id'], ['id'], ondelete='CASCADE',
+        )
+
+    op.drop_index('ix_works_slug', table_name='works')
+    op.create_index('uq_works_tenant_slug', 'works', ['tenant_id', 'slug'], unique=True)
+    op.create_index('ix_works_tenant_order', 'works', ['tenant_id', 'sort_order', 'created_at'])
+
+    op.create_unique_constraint('site_settings_tenant_id_key', 'site_settings', ['tenant_id'])
+    # The singleton row was inserted with an explicit id=1
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('site_settings', 'id'), "
+        "COALESCE((SELECT MAX(id) FROM site_settings), 0) + 1, false)"
+    )
+
+    op.drop_index('ix_admin_users_email', table_name='admin_users')
+    op.create_unique_constraint('uq_admin_users_tenant_email', 'admin_users', ['tenant_id', 'email'])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM tenants WHERE id <> 1")
+    op.drop_constraint('uq_admin_users_tenant_email', 'admin_users', type_='unique')
+    op.create_index('ix_admin_users_email', 'admin_users', ['email'], unique=True)
+    op.drop_constraint('site_settings_tenant_id_key', 'site_settings', type_='unique')
+    op.drop_index('ix_works_tenant_order', table_name='works')
+    op.drop_index('uq_works_tenant_slug', table_name='works')
+    op.create_index('ix_works_slug', 'works', ['slug'], unique=True)
+    for table in TENANT_TABLES:
+        op.drop_constraint(f'{table}_tenant_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'tenant_id')
+    op.drop_table('tenants')
@@ -0,0 +1,32 @@
+"""work views
+
+Revision ID: 9b2d41c7e5a8
+Revises: 4f1c2a9e7b30
+Create Date: 2026-10-19 11:02:17.540391
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2d41c7e5a8'
+down_revision: Union[str, None] = '4f1c2a9e7b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('work_views',
+    sa.Column('work_id', sa.UUID(), nullable=False),
+    sa.Column('views', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('clicks', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['work_id'], ['works.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('work_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('work_views')
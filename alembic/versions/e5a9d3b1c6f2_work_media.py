@@ -0,0 +1,64 @@
+"""work media
+
+Revision ID: e5a9d3b1c6f2
+Revises: c7e3f08a2d14
+Create Date: 2026-10-19 16:21:09.482715
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9d3b1c6f2'
+down_revision: Union[str, None] = 'c7e3f08a2d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSITION_STEP = 1024  # app.models.work.MEDIA_POSITION_STEP
+
+
+def upgrade() -> None:
+    op.create_table('work_media',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('work_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['work_id'], ['works.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_work_media_key', 'work_media', ['key'], unique=False)
+    op.create_index('ix_work_media_work_position', 'work_media', ['work_id', 'position'], unique=False)
+    op.create_index('ix_works_tenant_cover', 'works', ['tenant_id', 'cover_url'], unique=False)
+
+    # Gallery arrays become rows, in array order
+    op.execute(f"""
+        INSERT INTO work_media (id, work_id, position, key, kind)
+        SELECT gen_random_uuid(), w.id, g.ord * {POSITION_STEP}, g.key,
+               CASE WHEN lower(g.key) ~ '\\.(mp4|webm|mov)$' THEN 'video' ELSE 'image' END
+        FROM works w, unnest(w.gallery_urls) WITH ORDINALITY AS g(key, ord)
+        WHERE g.key <> ''
+    """)
+    op.drop_column('works', 'gallery_urls')
+
+
+def downgrade() -> None:
+    op.add_column('works', sa.Column('gallery_urls', postgresql.ARRAY(sa.String()), server_default='{}', nullable=False))
+    op.execute("""
+        UPDATE works w SET gallery_urls = m.keys
+        FROM (
+            SELECT work_id, array_agg(key ORDER BY position) AS keys
+            FROM work_media GROUP BY work_id
+        ) m
+        WHERE m.work_id = w.id
+    """)
+    op.drop_index('ix_works_tenant_cover', table_name='works')
+    op.drop_index('ix_work_media_work_position', table_name='work_media')
+    op.drop_index('ix_work_media_key', table_name='work_media')
+    op.drop_table('work_media')
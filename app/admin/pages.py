@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.core.config import get_settings
 from app.core.database import get_db
@@ -10,8 +11,10 @@ from app.core.security import (
     SESSION_COOKIE, create_session_token, get_current_admin, verify_password,
 )
 from app.core.templates import templates
+from app.core.tenancy import get_tenant
 from app.models.user import AdminUser
 from app.models.work import Work
+from app.schemas.tenant import TenantInfo
 from app.services.settings import get_site_settings
 
 settings = get_settings()
@@ -29,9 +32,14 @@ async def login_submit(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
+    tenant: TenantInfo = Depends(get_tenant),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(AdminUser).where(AdminUser.email == email, AdminUser.is_active.is_(True))
+    stmt = select(AdminUser).where(
+        AdminUser.tenant_id == tenant.id,
+        AdminUser.email == email,
+        AdminUser.is_active.is_(True),
+    )
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
@@ -42,7 +50,7 @@ async def login_submit(
             status_code=400,
         )
 
-    token = create_session_token(user.id)
+    token = create_session_token(user.id, tenant.id)
     response = RedirectResponse(url="/admin/", status_code=303)
     response.set_cookie(
         SESSION_COOKIE, token,
@@ -66,7 +74,11 @@ async def dashboard(
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(Work).order_by(Work.sort_order, Work.created_at.desc())
+    stmt = (
+        select(Work)
+        .where(Work.tenant_id == admin.tenant_id)
+        .order_by(Work.sort_order, Work.created_at.desc())
+    )
     result = await db.execute(stmt)
     works = result.scalars().all()
     return templates.TemplateResponse(
@@ -92,8 +104,8 @@ async def edit_work_page(
     db: AsyncSession = Depends(get_db),
 ):
     import uuid as _uuid
-    work = await db.get(Work, _uuid.UUID(work_id))
-    if not work:
+    work = await db.get(Work, _uuid.UUID(work_id), options=[selectinload(Work.media)])
+    if not work or work.tenant_id != admin.tenant_id:
         raise HTTPException(status_code=404, detail="Work not found")
     return templates.TemplateResponse(
         "admin/work_form.html",
@@ -107,7 +119,7 @@ async def settings_page(
     admin: AdminUser = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    site = await get_site_settings(db)
+    site = await get_site_settings(db, admin.tenant_id)
     return templates.TemplateResponse(
         "admin/settings.html",
         {"request": request, "site": site, "admin": admin, "settings": settings},
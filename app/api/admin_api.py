@@ -1,17 +1,37 @@
+import hashlib
 import uuid
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Request, UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.cache import get_cache
+from app.core.database import async_session_factory, get_db
 from app.core.limiter import limiter
 from app.core.security import get_current_admin
+from app.core.singleflight import flight_stats
+from app.core.tenancy import get_tenant
 from app.models.user import AdminUser
-from app.models.work import Work
-from app.schemas.work import WorkCreate, WorkDetail, WorkUpdate
+from app.models.work import Work, WorkMedia, media_kind
+from app.schemas.tenant import TenantInfo
+from app.schemas.work import (
+    BulkResult, WorkBulkDelete, WorkBulkTags, WorkCreate, WorkDetail, WorkMediaCreate,
+    WorkMediaItem, WorkMediaUpdate, WorkReorder, WorkUpdate,
+)
 from app.schemas.settings import SiteSettingsResponse, SiteSettingsUpdate
-from app.services.s3 import upload_file_to_s3
+from app.services.cdn import schedule_purge, site_tag, work_media_keys, work_tag
+from app.services.media_store import store_uploads
+from app.services.portfolio_io import export_ndjson, import_ndjson, iter_lines
+from app.services.prewarm import make_client, prewarm_tenant
+from app.services.publisher import PublishError, publish_site, schedule_publish
+from app.services.related import invalidate_related, related_entry, update_related
+from app.services.streaming import stream_json_array, stream_ndjson
+from app.services.work_media import key_references, position_at, touch_work
 from app.services.settings import get_site_settings
 
 router = APIRouter(
@@ -23,108 +43,496 @@ router = APIRouter(
 
 # ── Works CRUD ──────────────────────────────────────────────
 
+def _admin_list_stmt(tenant: TenantInfo):
+    return (
+        select(Work)
+        .options(selectinload(Work.media))
+        .where(Work.tenant_id == tenant.id)
+        .order_by(Work.sort_order, Work.created_at.desc())
+    )
+
+
+def _serialize_detail(work: Work) -> dict:
+    return WorkDetail.model_validate(work).model_dump(mode="json")
+
+
 @router.get("/works", response_model=list[WorkDetail])
-async def admin_list_works(db: AsyncSession = Depends(get_db)):
-    stmt = select(Work).order_by(Work.sort_order, Work.created_at.desc())
-    result = await db.execute(stmt)
-    return result.scalars().all()
+async def admin_list_works(tenant: TenantInfo = Depends(get_tenant)):
+    """JSON array streamed from a server-side cursor (stored keys, not URLs)."""
+    return StreamingResponse(
+        stream_json_array(async_session_factory, _admin_list_stmt(tenant), _serialize_detail),
+        media_type="application/json",
+    )
+
+
+@router.get("/works/stream", response_model=list[WorkDetail])
+async def admin_stream_works(tenant: TenantInfo = Depends(get_tenant)):
+    """Same as the list endpoint, as NDJSON (one work per line)."""
+    return StreamingResponse(
+        stream_ndjson(async_session_factory, _admin_list_stmt(tenant), _serialize_detail),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.post("/works", response_model=WorkDetail, status_code=201)
-async def admin_create_work(data: WorkCreate, db: AsyncSession = Depends(get_db)):
-    existing = await db.execute(select(Work).where(Work.slug == data.slug))
+async def admin_create_work(
+    data: WorkCreate, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    existing = await db.execute(
+        select(Work.id).where(Work.tenant_id == tenant.id, Work.slug == data.slug)
+    )
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=409, detail="Slug already exists")
-    work = Work(**data.model_dump())
+    work = Work(**data.model_dump(), tenant_id=tenant.id)
     db.add(work)
     await db.flush()
-    await db.refresh(work)
+    await _reload(db, work)
+    background_tasks.add_task(update_related, tenant.id, [related_entry(work)])
+    schedule_publish(background_tasks, tenant)
     return work
 
 
-@router.get("/works/{work_id}", response_model=WorkDetail)
-async def admin_get_work(work_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    work = await db.get(Work, work_id)
-    if not work:
+async def _get_work(db: AsyncSession, tenant: TenantInfo, work_id: uuid.UUID, *options) -> Work:
+    """The tenant's work or 404 (other tenants' ids look like missing ones)."""
+    work = await db.get(Work, work_id, options=options)
+    if not work or work.tenant_id != tenant.id:
         raise HTTPException(status_code=404, detail="Work not found")
     return work
 
 
+async def _reload(db: AsyncSession, work: Work) -> None:
+    """Refresh server-set columns; the gallery is reloaded too, since a plain
+    refresh would leave the raise_on_sql relationship unloaded."""
+    await db.refresh(work)
+    await db.refresh(work, ["media"])
+
+
+# ── Bulk operations ─────────────────────────────────────────
+
+async def _existing_ids(
+    db: AsyncSession, tenant: TenantInfo, ids: list[uuid.UUID],
+) -> set[uuid.UUID]:
+    result = await db.execute(
+        select(Work.id).where(Work.tenant_id == tenant.id, Work.id.in_(ids))
+    )
+    return set(result.scalars().all())
+
+
+def _clean_tags(tags: list[str]) -> list[str]:
+    return [t.strip() for t in tags if t.strip()]
+
+
+@router.post("/works/reorder", response_model=BulkResult)
+async def admin_reorder_works(
+    data: WorkReorder, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Set sort_order for many works at once (one executemany UPDATE)."""
+    if not data.items:
+        return BulkResult(affected=0)
+    ids = [item.id for item in data.items]
+    # Also the tenant check: the UPDATE below only runs on ids owned by this tenant
+    missing = set(ids) - await _existing_ids(db, tenant, ids)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Works not found: {sorted(map(str, missing))}")
+    await db.execute(
+        update(Work),
+        [{"id": item.id, "sort_order": item.sort_order} for item in data.items],
+    )
+    schedule_purge(db, background_tasks, (), [site_tag(tenant)])
+    background_tasks.add_task(
+        update_related, tenant.id,
+        [{"id": item.id, "sort_order": item.sort_order} for item in data.items],
+    )
+    schedule_publish(background_tasks, tenant)
+    return BulkResult(affected=len(data.items))
+
+
+@router.post("/works/bulk-delete", response_model=BulkResult)
+async def admin_bulk_delete_works(
+    data: WorkBulkDelete, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    if not data.ids:
+        return BulkResult(affected=0)
+    result = await db.execute(
+        select(Work)
+        .options(selectinload(Work.media))
+        .where(Work.tenant_id == tenant.id, Work.id.in_(data.ids))
+    )
+    deleted = result.scalars().all()
+    await db.execute(delete(Work).where(Work.id.in_([w.id for w in deleted])))
+    schedule_purge(
+        db, background_tasks,
+        set().union(*(work_media_keys(w) for w in deleted)),
+        [site_tag(tenant), *(work_tag(tenant, w.slug) for w in deleted)],
+    )
+    background_tasks.add_task(update_related, tenant.id, [], [w.id for w in deleted])
+    schedule_publish(background_tasks, tenant)
+    return BulkResult(affected=len(deleted))
+
+
+@router.post("/works/bulk-tags", response_model=BulkResult)
+async def admin_bulk_update_tags(
+    data: WorkBulkTags, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add/remove tags (or replace them entirely) on many works at once."""
+    if not data.ids:
+        return BulkResult(affected=0)
+    result = await db.execute(
+        select(Work.id, Work.slug, Work.tags)
+        .where(Work.tenant_id == tenant.id, Work.id.in_(data.ids))
+    )
+    rows = result.all()
+    if not rows:
+        return BulkResult(affected=0)
+
+    add, remove = _clean_tags(data.add), set(_clean_tags(data.remove))
+    params, slugs = [], []
+    for work_id, slug, tags in rows:
+        if data.replace is not None:
+            new_tags = list(dict.fromkeys(_clean_tags(data.replace)))
+        else:
+            new_tags = [t for t in dict.fromkeys([*tags, *add]) if t not in remove]
+        if new_tags != tags:
+            params.append({"id": work_id, "tags": new_tags})
+            slugs.append(slug)
+    if params:
+        await db.execute(update(Work), params)
+        schedule_purge(
+            db, background_tasks, (), [site_tag(tenant), *(work_tag(tenant, s) for s in slugs)],
+        )
+        background_tasks.add_task(update_related, tenant.id, params)
+        schedule_publish(background_tasks, tenant)
+    return BulkResult(affected=len(params))
+
+
+@router.get("/works/{work_id}", response_model=WorkDetail)
+async def admin_get_work(
+    work_id: uuid.UUID, tenant: TenantInfo = Depends(get_tenant), db: AsyncSession = Depends(get_db),
+):
+    return await _get_work(db, tenant, work_id, selectinload(Work.media))
+
+
 @router.patch("/works/{work_id}", response_model=WorkDetail)
 async def admin_update_work(
-    work_id: uuid.UUID, data: WorkUpdate, db: AsyncSession = Depends(get_db),
+    work_id: uuid.UUID, data: WorkUpdate, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
 ):
-    work = await db.get(Work, work_id)
-    if not work:
-        raise HTTPException(status_code=404, detail="Work not found")
+    work = await _get_work(db, tenant, work_id, selectinload(Work.media))
+    old_media = work_media_keys(work)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(work, field, value)
     await db.flush()
-    await db.refresh(work)
+    await _reload(db, work)
+    schedule_purge(
+        db, background_tasks,
+        old_media - work_media_keys(work),
+        [site_tag(tenant), work_tag(tenant, work.slug)],
+    )
+    background_tasks.add_task(update_related, tenant.id, [related_entry(work)])
+    schedule_publish(background_tasks, tenant)
     return work
 
 
 @router.delete("/works/{work_id}", status_code=204)
-async def admin_delete_work(work_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    work = await db.get(Work, work_id)
-    if not work:
-        raise HTTPException(status_code=404, detail="Work not found")
+async def admin_delete_work(
+    work_id: uuid.UUID, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    work = await _get_work(db, tenant, work_id, selectinload(Work.media))
     await db.delete(work)
+    schedule_purge(
+        db, background_tasks, work_media_keys(work), [site_tag(tenant), work_tag(tenant, work.slug)],
+    )
+    background_tasks.add_task(update_related, tenant.id, [], [work.id])
+    schedule_publish(background_tasks, tenant)
     return None
 
 
+# ── Gallery media ───────────────────────────────────────────
+# Single-item edits: each writes one work_media row instead of rewriting the
+# whole gallery through PATCH /works/{id}.
+
+async def _get_media(db: AsyncSession, work: Work, media_id: uuid.UUID) -> WorkMedia:
+    item = await db.get(WorkMedia, media_id)
+    if not item or item.work_id != work.id:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return item
+
+
+def _after_gallery_change(
+    db: AsyncSession, background_tasks: BackgroundTasks, tenant: TenantInfo, work: Work,
+    removed: set[str] = frozenset(),
+) -> None:
+    schedule_purge(db, background_tasks, removed, [work_tag(tenant, work.slug)])
+    schedule_publish(background_tasks, tenant)
+
+
+@router.get("/works/{work_id}/media", response_model=list[WorkMediaItem])
+async def admin_list_media(
+    work_id: uuid.UUID, tenant: TenantInfo = Depends(get_tenant), db: AsyncSession = Depends(get_db),
+):
+    work = await _get_work(db, tenant, work_id, selectinload(Work.media))
+    return work.media
+
+
+@router.post("/works/{work_id}/media", response_model=WorkMediaItem, status_code=201)
+async def admin_add_media(
+    work_id: uuid.UUID, data: WorkMediaCreate, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add one gallery item at ``index`` (default: last)."""
+    work = await _get_work(db, tenant, work_id)
+    item = WorkMedia(
+        work_id=work.id,
+        position=await position_at(db, work.id, data.index),
+        key=data.key,
+        kind=data.kind or media_kind(data.key),
+        width=data.width, height=data.height, size=data.size,
+    )
+    db.add(item)
+    await touch_work(db, work.id)
+    await db.flush()
+    _after_gallery_change(db, background_tasks, tenant, work)
+    return item
+
+
+@router.patch("/works/{work_id}/media/{media_id}", response_model=WorkMediaItem)
+async def admin_update_media(
+    work_id: uuid.UUID, media_id: uuid.UUID, data: WorkMediaUpdate,
+    background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update one item's metadata and/or move it to ``index``."""
+    work = await _get_work(db, tenant, work_id)
+    item = await _get_media(db, work, media_id)
+    changes = data.model_dump(exclude_unset=True)
+    index = changes.pop("index", None)
+    if index is not None:
+        item.position = await position_at(db, work.id, index, exclude=item.id)
+    for field, value in changes.items():
+        setattr(item, field, value)
+    await touch_work(db, work.id)
+    await db.flush()
+    _after_gallery_change(db, background_tasks, tenant, work)
+    return item
+
+
+@router.delete("/works/{work_id}/media/{media_id}", status_code=204)
+async def admin_delete_media(
+    work_id: uuid.UUID, media_id: uuid.UUID, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    work = await _get_work(db, tenant, work_id)
+    item = await _get_media(db, work, media_id)
+    await db.delete(item)
+    await touch_work(db, work.id)
+    _after_gallery_change(db, background_tasks, tenant, work, {item.key})
+    return None
+
+
+@router.get("/media/references")
+async def admin_media_references(
+    key: str = Query(..., description="Stored media key"),
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Works that use ``key`` as cover or gallery item: ``[{work_id, slug, role}]``."""
+    return await key_references(db, tenant.id, key)
+
+
 # ── Server-side upload ──────────────────────────────────────
 
+ALLOWED_UPLOAD_TYPES = {
+    "image/jpeg", "image/png", "image/webp", "image/gif",
+    "image/heic", "image/heif",
+    "video/mp4", "video/webm", "video/quicktime",
+}
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # 20MB limit
+MAX_BATCH_FILES = 50
+MAX_BATCH_BYTES = 200 * 1024 * 1024  # all files of one batch request
+
+
+UPLOAD_READ_CHUNK = 1024 * 1024
+
+
+def _clean_folder(folder: str) -> str:
+    """Validated upload folder, relative to the tenant's bucket prefix."""
+    folder = folder.strip().strip("/") + "/"
+    if ".." in folder:
+        raise HTTPException(status_code=400, detail="Invalid folder path")
+    return folder
+
+
+async def _read_upload(file: UploadFile) -> dict:
+    """Validate content type and size, hashing (SHA-256) one chunk at a time;
+    raises HTTPException(400). Returns a ``store_uploads`` item whose data is
+    the rewound spooled file, so it is streamed to the bucket, not held in memory."""
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
+        raise HTTPException(status_code=400, detail=f"Content type {file.content_type!r} not allowed")
+    digest, size = hashlib.sha256(), 0
+    while chunk := await file.read(UPLOAD_READ_CHUNK):
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=400, detail="File too large (max 20MB)")
+        digest.update(chunk)
+    await file.seek(0)
+    return {
+        "file_data": file.file,
+        "size": size,
+        "filename": file.filename or "upload",
+        "content_type": file.content_type,
+        "sha256": digest.hexdigest(),
+    }
+
+
 @router.post("/upload")
 @limiter.limit("30/minute")
 async def upload_file(
     request: Request,
     file: UploadFile = File(...),
     folder: str = Form("works/"),
+    tenant: TenantInfo = Depends(get_tenant),
 ):
-    """Upload file through the server to S3 bucket."""
-    # Validate content type
-    allowed = {
-        "image/jpeg", "image/png", "image/webp", "image/gif",
-        "image/heic", "image/heif",
-        "video/mp4", "video/webm", "video/quicktime",
-    }
-    if file.content_type not in allowed:
-        raise HTTPException(status_code=400, detail=f"Content type {file.content_type!r} not allowed")
+    """Upload file through the server to S3 bucket (content-addressed, deduplicated)."""
+    folder = _clean_folder(folder)
+    [result] = await store_uploads(tenant, folder, [await _read_upload(file)])
+    if not result["ok"]:
+        raise HTTPException(status_code=502, detail=f"Upload failed: {result['error']}")
+    return result
 
-    # Validate folder
-    folder = folder.strip().strip("/") + "/"
-    if ".." in folder:
-        raise HTTPException(status_code=400, detail="Invalid folder path")
 
-    # Read and upload
-    data = await file.read()
-    if len(data) > 20 * 1024 * 1024:  # 20MB limit
-        raise HTTPException(status_code=400, detail="File too large (max 20MB)")
+@router.post("/upload/batch")
+@limiter.limit("30/minute")
+async def upload_files(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    folder: str = Form("works/"),
+    tenant: TenantInfo = Depends(get_tenant),
+):
+    """Upload several files in one request; new content goes to the bucket concurrently.
 
-    result = upload_file_to_s3(
-        file_data=data,
-        filename=file.filename or "upload",
-        content_type=file.content_type,
-        folder=folder,
-    )
-    return result
+    Returns one result per file, in order: ``{filename, ok, key, public_url,
+    deduplicated}`` or ``{filename, ok: false, error}``.
+    """
+    folder = _clean_folder(folder)
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FILES} files per request")
+    if sum(file.size or 0 for file in files) > MAX_BATCH_BYTES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_BYTES >> 20}MB per request")
+
+    results: list[dict | None] = [None] * len(files)
+    pending, pending_idx = [], []
+    for i, file in enumerate(files):
+        try:
+            pending.append(await _read_upload(file))
+        except HTTPException as exc:
+            results[i] = {"filename": file.filename or "upload", "ok": False, "error": exc.detail}
+            continue
+        pending_idx.append(i)
+
+    stored = await store_uploads(tenant, folder, pending) if pending else []
+    for i, item, result in zip(pending_idx, pending, stored):
+        results[i] = {"filename": item["filename"], **result}
+    return results
 
 
 # ── Site Settings ───────────────────────────────────────────
 
 @router.get("/settings", response_model=SiteSettingsResponse)
-async def admin_get_settings(db: AsyncSession = Depends(get_db)):
-    return await get_site_settings(db)
+async def admin_get_settings(tenant: TenantInfo = Depends(get_tenant), db: AsyncSession = Depends(get_db)):
+    return await get_site_settings(db, tenant.id)
 
 
 @router.patch("/settings", response_model=SiteSettingsResponse)
 async def admin_update_settings(
-    data: SiteSettingsUpdate, db: AsyncSession = Depends(get_db),
+    data: SiteSettingsUpdate, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
 ):
-    settings = await get_site_settings(db)
+    settings = await get_site_settings(db, tenant.id)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(settings, field, value)
     await db.flush()
     await db.refresh(settings)
+    schedule_purge(db, background_tasks, (), [site_tag(tenant)])
+    schedule_publish(background_tasks, tenant)
     return settings
+
+
+# ── Import / export ─────────────────────────────────────────
+
+@router.get("/export")
+async def admin_export(tenant: TenantInfo = Depends(get_tenant)):
+    """Stream the whole portfolio as NDJSON."""
+    async def body():
+        # The request-scoped session is closed before a streaming body runs,
+        # so the export keeps its own for the lifetime of the stream.
+        async with async_session_factory() as session:
+            async for chunk in export_ndjson(session, tenant.id):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="portfolio.ndjson"'},
+    )
+
+
+@router.post("/import")
+async def admin_import(
+    request: Request, background_tasks: BackgroundTasks,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upsert works and site settings from an NDJSON request body."""
+    try:
+        counts = await import_ndjson(db, tenant.id, iter_lines(request.stream()))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    schedule_purge(db, background_tasks, (), [site_tag(tenant)])
+    background_tasks.add_task(invalidate_related, tenant.id)
+    schedule_publish(background_tasks, tenant)
+    return counts
+
+
+# ── Static site ─────────────────────────────────────────────
+
+@router.post("/publish")
+async def admin_publish(tenant: TenantInfo = Depends(get_tenant), db: AsyncSession = Depends(get_db)):
+    """Render the public site and upload changed files to the bucket now."""
+    try:
+        return await publish_site(db, tenant)
+    except PublishError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# ── Caches ──────────────────────────────────────────────────
+
+@router.get("/cache")
+async def admin_cache_stats():
+    """App cache backend, size and this worker's hits/misses per namespace,
+    plus how many reads joined an in-flight computation instead of running."""
+    return {**await get_cache().stats(), "single_flight": flight_stats()}
+
+
+# ── Cache pre-warming ───────────────────────────────────────
+
+@router.post("/prewarm")
+async def admin_prewarm(request: Request, tenant: TenantInfo = Depends(get_tenant)):
+    """Request every public page of this site in-process (warms this worker's
+    caches) and report per-URL status and timings."""
+    async with make_client(request.app) as client:
+        return await prewarm_tenant(client, tenant, host=request.headers.get("host"))
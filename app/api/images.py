@@ -0,0 +1,50 @@
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.media import MediaFileResponse
+from app.core.tenancy import get_tenant, owns_key
+from app.schemas.tenant import TenantInfo
+from app.services.image_variants import InvalidVariant, get_variant, parse_variant
+from app.services.imaging import TransformError
+from app.services.media_cache import ObjectTooLarge
+from app.services.s3 import IMMUTABLE_CACHE_CONTROL, is_not_found, is_private_key
+
+router = APIRouter(tags=["media"])
+
+
+@router.get("/img/{key:path}")
+async def serve_image(
+    key: str,
+    w: int | None = None,
+    h: int | None = None,
+    fit: str | None = None,
+    fmt: str | None = None,
+    sig: str | None = Query(None, alias="s"),
+    tenant: TenantInfo = Depends(get_tenant),
+):
+    """Serve a resized / re-encoded variant of one of the tenant's images.
+
+    Unsigned requests may only use IMAGE_WIDTHS as sizes; see
+    app.services.image_variants.
+    """
+    if not key or ".." in key.split("/") or is_private_key(key) or not owns_key(tenant, key):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        variant = parse_variant(key, w, h, fit, fmt, sig, tenant.bucket_prefix)
+    except InvalidVariant as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        path = await get_variant(variant)
+    except ObjectTooLarge:
+        raise HTTPException(status_code=413, detail="Image too large to transform")
+    except TransformError:
+        raise HTTPException(status_code=415, detail="Not an image")
+    except ClientError as exc:
+        if is_not_found(exc):
+            raise HTTPException(status_code=404, detail="Not found")
+        raise
+
+    return MediaFileResponse(
+        path, media_type=variant.media_type, headers={"cache-control": IMMUTABLE_CACHE_CONTROL},
+    )
@@ -0,0 +1,98 @@
+import mimetypes
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.core.config import get_settings
+from app.core.tenancy import get_tenant, owns_key
+from app.schemas.tenant import TenantInfo
+from app.services.media_cache import ObjectTooLarge, media_cache
+from app.services.s3 import (
+    IMMUTABLE_CACHE_CONTROL, get_s3_client, is_not_found, is_private_key, run_s3,
+)
+
+settings = get_settings()
+router = APIRouter(tags=["media"])
+
+STREAM_CHUNK = 256 * 1024
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse that hands whole-file bodies to the server for zero-copy
+    sending (``http.response.pathsend``) when the ASGI server supports it.
+    Range requests and other servers use the regular chunked path."""
+
+    async def __call__(self, scope, receive, send):
+        self._pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send, send_header_only: bool) -> None:
+        if send_header_only or not self._pathsend:
+            return await super()._handle_simple(send, send_header_only)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": str(Path(self.path).resolve())})
+
+
+async def _stream_from_bucket(key: str, http_range: str | None) -> StreamingResponse:
+    """Pass a (range) request straight through to the bucket without caching."""
+    params = {"Bucket": settings.S3_BUCKET_NAME, "Key": key}
+    if http_range:
+        params["Range"] = http_range
+    try:
+        obj = await run_s3(get_s3_client().get_object, **params)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "InvalidRange":
+            raise HTTPException(status_code=416, detail="Range not satisfiable")
+        raise
+
+    headers = {
+        "accept-ranges": "bytes",
+        "content-length": str(obj["ContentLength"]),
+        "cache-control": IMMUTABLE_CACHE_CONTROL,
+    }
+    if obj.get("ContentRange"):
+        headers["content-range"] = obj["ContentRange"]
+    body = obj["Body"]
+
+    async def chunks():
+        try:
+            while chunk := await run_s3(body.read, STREAM_CHUNK):
+                yield chunk
+        finally:
+            body.close()
+
+    return StreamingResponse(
+        chunks(),
+        status_code=206 if obj.get("ContentRange") else 200,
+        media_type=obj.get("ContentType"),
+        headers=headers,
+    )
+
+
+@router.get("/media/{key:path}")
+async def serve_media(key: str, request: Request, tenant: TenantInfo = Depends(get_tenant)):
+    """Serve a bucket object with Range support from the local disk cache.
+
+    Only the requesting tenant's public keys are served. Objects larger than
+    MEDIA_CACHE_MAX_OBJECT_BYTES are streamed from the bucket per request
+    instead of being cached.
+    """
+    if not key or ".." in key.split("/") or is_private_key(key) or not owns_key(tenant, key):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    try:
+        path = await media_cache.get_path(key)
+    except ObjectTooLarge:
+        return await _stream_from_bucket(key, request.headers.get("range"))
+    except ClientError as exc:
+        if is_not_found(exc):
+            raise HTTPException(status_code=404, detail="Not found")
+        raise
+
+    return MediaFileResponse(
+        path,
+        media_type=mimetypes.guess_type(key)[0] or "application/octet-stream",
+        headers={"cache-control": IMMUTABLE_CACHE_CONTROL},
+    )
@@ -1,39 +1,99 @@
+from functools import partial
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.templates import templates
+from app.core.config import get_settings
+from app.core.database import get_read_db, read_session
+from app.core.security import is_admin_request
+from app.core.templates import static_url, templates
+from app.core.tenancy import get_tenant
 from app.models.work import Work
-from app.services.settings import get_site_settings
+from app.schemas.tenant import TenantInfo
+from app.services.analytics import record_view
+from app.services.cdn import surrogate_headers, work_tag
+from app.services.fragments import render_grid
+from app.services.image_variants import grid_sizes, srcset
+from app.services.related import related_works
+from app.services.s3 import safe_s3url
+from app.services.settings import get_cached_site_settings
+from app.services.work_reads import work_details
 
+settings = get_settings()
 router = APIRouter(tags=["pages"])
 
 
+def _hero_cover_urls(works) -> dict[str, str]:
+    """Media URLs of the first HOMEPAGE_PRELOAD_COVERS covers, by slug."""
+    urls = {}
+    for work in works:
+        if len(urls) >= settings.HOMEPAGE_PRELOAD_COVERS:
+            break
+        if work.cover_url:
+            urls[work.slug] = safe_s3url(work.cover_url)
+    return urls
+
+
+def _preload_header(works, hero_urls: dict[str, str]) -> str:
+    """``Link`` header for the stylesheet and hero covers. CDNs that support
+    103 Early Hints (e.g. Cloudflare) derive them from this header. Covers
+    with a srcset announce it too, so the preload matches the <img>."""
+    links = [f"<{static_url('css/main.css')}>; rel=preload; as=style"]
+    for work in works:
+        url = hero_urls.get(work.slug)
+        if not url:
+            continue
+        link = f"<{url}>; rel=preload; as=image; fetchpriority=high"
+        if candidates := srcset(work.cover_url):
+            link += f'; imagesrcset="{candidates}"; imagesizes="{grid_sizes(work.span_class, work.is_tall)}"'
+        links.append(link)
+    return ", ".join(links)
+
+
 @router.get("/", response_class=HTMLResponse)
-async def index(request: Request, db: AsyncSession = Depends(get_db)):
-    stmt = select(Work).order_by(Work.sort_order, Work.created_at.desc())
+async def index(
+    request: Request,
+    tenant: TenantInfo = Depends(get_tenant),
+    db: AsyncSession = Depends(get_read_db),
+):
+    stmt = (
+        select(Work)
+        .where(Work.tenant_id == tenant.id)
+        .order_by(Work.sort_order, Work.created_at.desc())
+    )
     result = await db.execute(stmt)
     works = result.scalars().all()
-    site = await get_site_settings(db)
+    site = await get_cached_site_settings(
+        partial(read_session, request), tenant, fresh=is_admin_request(request, tenant),
+    )
+    hero_urls = _hero_cover_urls(works)
     return templates.TemplateResponse(
         "public/index.html",
-        {"request": request, "works": works, "site": site},
+        {
+            "request": request, "works": works, "site": site, "hero_urls": hero_urls,
+            "grid_fragments": await render_grid(works, hero_urls),
+        },
+        headers={**surrogate_headers(tenant), "Link": _preload_header(works, hero_urls)},
     )
 
 
 @router.get("/work/{slug}", response_class=HTMLResponse)
 async def work_detail_page(
-    request: Request, slug: str, db: AsyncSession = Depends(get_db),
+    request: Request, slug: str,
+    tenant: TenantInfo = Depends(get_tenant),
 ):
-    stmt = select(Work).where(Work.slug == slug)
-    result = await db.execute(stmt)
-    work = result.scalar_one_or_none()
+    open_session = partial(read_session, request)
+    fresh = is_admin_request(request, tenant)
+    work = (await work_details(open_session, tenant, [slug], fresh)).get(slug)
     if not work:
         raise HTTPException(status_code=404, detail="Work not found")
-    site = await get_site_settings(db)
+    record_view(tenant.id, slug)
+    site = await get_cached_site_settings(open_session, tenant, fresh)
+    related = await related_works(tenant.id, slug)
     return templates.TemplateResponse(
         "public/work_detail.html",
-        {"request": request, "work": work, "site": site},
+        {"request": request, "work": work, "site": site, "related": related},
+        headers=surrogate_headers(tenant, work_tag(tenant, slug)),
     )
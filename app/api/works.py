@@ -1,46 +1,155 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from functools import partial
 
-from app.core.database import get_db
-from app.core.limiter import limiter
-from app.models.work import Work
-from app.schemas.work import WorkDetail, WorkListItem
-from app.services.s3 import get_presigned_read_url
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.database import read_session
+from app.core.limiter import is_prewarm_request, limiter
+from app.core.security import is_admin_request
+from app.core.tenancy import get_tenant
+from app.schemas.tenant import TenantInfo
+from app.schemas.work import WorkListItem, WorkPublicDetail
+from app.services.analytics import record_click
+from app.services.related import get_related_index
+from app.services.s3 import get_media_url
+from app.services.streaming import stream_json_array, stream_ndjson
+from app.services.work_media import MAX_PREVIEW_MEDIA
+from app.services.work_reads import (
+    attach_first_media, list_item, list_stmt, work_details, work_list,
+)
 
 router = APIRouter(prefix="/api/works", tags=["works"])
 
+MAX_BATCH_SLUGS = 24
+
 
 def _resolve_urls(work_dict: dict) -> dict:
-    """Convert S3 keys to presigned read URLs in API response."""
+    """Copy of a work dict with S3 keys converted to client-facing media URLs."""
+    resolved = dict(work_dict)
     if work_dict.get("cover_url"):
-        work_dict["cover_url"] = get_presigned_read_url(work_dict["cover_url"])
+        resolved["cover_url"] = get_media_url(work_dict["cover_url"])
     if work_dict.get("gallery_urls"):
-        work_dict["gallery_urls"] = [get_presigned_read_url(u) for u in work_dict["gallery_urls"]]
-    return work_dict
+        resolved["gallery_urls"] = [get_media_url(u) for u in work_dict["gallery_urls"]]
+    if "media" in work_dict:
+        resolved["media"] = [{**m, "url": get_media_url(m["key"])} for m in work_dict["media"]]
+    return resolved
+
+
+def _with_related(work_dict: dict, related: list[dict]) -> dict:
+    return {
+        **work_dict,
+        "related": [
+            {**r, "cover_url": get_media_url(r["cover_url"]) if r["cover_url"] else ""}
+            for r in related
+        ],
+    }
+
+
+def _serialize_list_item(work, with_media: bool = False) -> dict:
+    return _resolve_urls(list_item(work, with_media))
+
+
+def _list_streamer(stream, request: Request, stmt, media: int):
+    """``stream`` over ``stmt``; with ``media`` > 0 each chunk's first media
+    are loaded in one query and included per item."""
+    if not media:
+        return stream(partial(read_session, request), stmt, _serialize_list_item)
+
+    serialize = partial(_serialize_list_item, with_media=True)
+    load_media = partial(attach_first_media, limit=media)
+    return stream(partial(read_session, request), stmt, serialize, load_media)
+
+
+SORT_QUERY = Query("order", pattern="^(order|popular)$", description="popular = most viewed first")
+MEDIA_QUERY = Query(
+    0, ge=0, le=MAX_PREVIEW_MEDIA, description="Include each work's first N gallery items",
+)
 
 
 @router.get("", response_model=list[WorkListItem])
-@limiter.limit("60/minute")
+@limiter.limit("60/minute", exempt_when=is_prewarm_request)
 async def list_works(
     request: Request,
     tag: str | None = Query(None),
-    db: AsyncSession = Depends(get_db),
+    sort: str = SORT_QUERY,
+    media: int = MEDIA_QUERY,
+    tenant: TenantInfo = Depends(get_tenant),
+):
+    """JSON array. Lists up to one stream chunk long come from the app cache
+    (concurrent misses share one query); longer ones are streamed from a
+    server-side cursor, chunk by chunk."""
+    items = await work_list(
+        partial(read_session, request), tenant, tag, sort, media, is_admin_request(request, tenant),
+    )
+    if items is not None:
+        return JSONResponse([_resolve_urls(item) for item in items])
+    return StreamingResponse(
+        _list_streamer(stream_json_array, request, list_stmt(tenant, tag, sort), media),
+        media_type="application/json",
+    )
+
+
+@router.get("/stream", response_model=list[WorkListItem])
+@limiter.limit("60/minute")
+async def stream_works(
+    request: Request,
+    tag: str | None = Query(None),
+    sort: str = SORT_QUERY,
+    media: int = MEDIA_QUERY,
+    tenant: TenantInfo = Depends(get_tenant),
+):
+    """Same as the list endpoint, as NDJSON (one work per line)."""
+    return StreamingResponse(
+        _list_streamer(stream_ndjson, request, list_stmt(tenant, tag, sort), media),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/batch", response_model=list[WorkPublicDetail])
+@limiter.limit("60/minute")
+async def get_works_batch(
+    request: Request,
+    slugs: str = Query(..., description=f"Comma-separated slugs (max {MAX_BATCH_SLUGS})"),
+    tenant: TenantInfo = Depends(get_tenant),
 ):
-    stmt = select(Work).order_by(Work.sort_order, Work.created_at.desc())
-    if tag:
-        stmt = stmt.where(Work.tags.any(tag))
-    result = await db.execute(stmt)
-    works = result.scalars().all()
-    return [_resolve_urls(WorkListItem.model_validate(w).model_dump()) for w in works]
+    """Several work details in one query, in the requested order (unknown slugs skipped)."""
+    wanted = list(dict.fromkeys(s.strip() for s in slugs.split(",") if s.strip()))
+    if len(wanted) > MAX_BATCH_SLUGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SLUGS} slugs per request")
+    if not wanted:
+        return []
+    details = await work_details(
+        partial(read_session, request), tenant, wanted, is_admin_request(request, tenant),
+    )
+    index = await get_related_index(tenant.id)
+    return [
+        _with_related(_resolve_urls(details[s]), index.related(s)) for s in wanted if s in details
+    ]
 
 
-@router.get("/{slug}", response_model=WorkDetail)
+@router.get("/{slug}", response_model=WorkPublicDetail)
 @limiter.limit("60/minute")
-async def get_work(request: Request, slug: str, db: AsyncSession = Depends(get_db)):
-    stmt = select(Work).where(Work.slug == slug)
-    result = await db.execute(stmt)
-    work = result.scalar_one_or_none()
+async def get_work(
+    request: Request, slug: str,
+    tenant: TenantInfo = Depends(get_tenant),
+):
+    details = await work_details(
+        partial(read_session, request), tenant, [slug], is_admin_request(request, tenant),
+    )
+    work = details.get(slug)
     if not work:
         raise HTTPException(status_code=404, detail="Work not found")
-    return _resolve_urls(WorkDetail.model_validate(work).model_dump())
+    # Not a view: the gallery prefetches details; opening one sends the click beacon
+    index = await get_related_index(tenant.id)
+    return _with_related(_resolve_urls(work), index.related(slug))
+
+
+@router.post("/{slug}/click", status_code=204)
+@limiter.limit("60/minute")
+async def record_work_click(
+    request: Request, slug: str, tenant: TenantInfo = Depends(get_tenant),
+):
+    """Click beacon from the gallery. Counted in memory only; unknown slugs
+    are dropped when the counters are flushed."""
+    record_click(tenant.id, slug)
+    return Response(status_code=204)
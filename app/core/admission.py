@@ -0,0 +1,153 @@
+"""Admission control: per-route-class concurrency budgets and request deadlines.
+
+Each request class (public pages, public API, admin, upload) gets a fixed
+number of concurrent slots and a short bounded queue. When the queue is full,
+or a slot doesn't free up within ADMISSION_QUEUE_TIMEOUT, the request is shed
+at once with 503 + ``Retry-After`` instead of piling up in the DB pool. Admin
+traffic has its own budget, so a public spike can't lock the admin out; only
+requests with a verified admin session use it, so login attempts (and other
+unauthenticated admin URLs) share the public budget.
+
+Admitted requests get a deadline (per class). Every DB transaction opened
+while serving the request sets ``statement_timeout`` to the time left (see
+``app.core.database``), so slow queries fail fast instead of holding a
+connection. The slot and the deadline are released as soon as the response
+is sent; background tasks that run afterwards are not bound by either.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# no DB work; served from disk/bucket (/img transforms are bounded by their process pool)
+EXEMPT_PREFIXES = ("/static/", "/media/", "/img/")
+ADMIN_PREFIXES = ("/api/admin", "/admin")
+
+
+class _Budget:
+    """Mutable per-request holder, so clearing it is seen by copied contexts too."""
+    __slots__ = ("deadline",)
+
+    def __init__(self, deadline: float | None):
+        self.deadline = deadline
+
+
+_budget: ContextVar[_Budget | None] = ContextVar("request_budget", default=None)
+
+
+def remaining_seconds() -> float | None:
+    """Time left until the current request's deadline, or None outside requests."""
+    budget = _budget.get()
+    if budget is None or budget.deadline is None:
+        return None
+    return budget.deadline - time.monotonic()
+
+
+def classify(path: str, admin: bool = False) -> str | None:
+    """Route class for a request path; None for paths exempt from admission.
+    Admin paths are ``public`` unless ``admin`` (a verified admin session)."""
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith(ADMIN_PREFIXES):
+        if not admin:
+            return "public"
+        return "upload" if path.startswith("/api/admin/upload") else "admin"
+    if path.startswith("/api/"):
+        return "api"
+    return "public"
+
+
+class _RouteClass:
+    def __init__(self, name: str, limit: int, deadline: float):
+        self.name = name
+        self.deadline = deadline
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if self.semaphore.locked() and self.waiting >= settings.ADMISSION_QUEUE_SIZE:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), settings.ADMISSION_QUEUE_TIMEOUT)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+
+def _route_classes() -> dict[str, _RouteClass]:
+    return {
+        "public": _RouteClass("public", settings.ADMISSION_PUBLIC_LIMIT, settings.DEADLINE_PUBLIC),
+        "api": _RouteClass("api", settings.ADMISSION_API_LIMIT, settings.DEADLINE_API),
+        "admin": _RouteClass("admin", settings.ADMISSION_ADMIN_LIMIT, settings.DEADLINE_ADMIN),
+        "upload": _RouteClass("upload", settings.ADMISSION_UPLOAD_LIMIT, settings.DEADLINE_UPLOAD),
+    }
+
+
+def overloaded_response(path: str):
+    headers = {"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+    if path.startswith("/api/"):
+        return JSONResponse(
+            {"detail": "Server busy, please retry shortly"}, status_code=503, headers=headers,
+        )
+    return PlainTextResponse("Server busy, please retry shortly.", status_code=503, headers=headers)
+
+
+def _has_admin_session(scope: Scope) -> bool:
+    # Imported here: app.core.security imports the database module, which imports this one
+    from app.core.security import admin_session
+
+    return admin_session(Request(scope)) is not None
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.classes = _route_classes()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        route_class = classify(path, path.startswith(ADMIN_PREFIXES) and _has_admin_session(scope))
+        if not route_class:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        rc = self.classes[route_class]
+        if not await rc.acquire():
+            await overloaded_response(path)(scope, receive, send)
+            return
+
+        budget = _Budget(arrived + rc.deadline)  # time spent queued counts
+        token = _budget.set(budget)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                budget.deadline = None
+                rc.semaphore.release()
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()  # response done: free the slot before background tasks run
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
+            _budget.reset(token)
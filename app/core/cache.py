@@ -0,0 +1,415 @@
+"""Application cache with interchangeable backends.
+
+CACHE_BACKEND picks the memory / hit-rate trade-off per deployment (unset:
+``shared`` with several workers per host, else ``memory``):
+
+- ``memory``: LRU per worker, CACHE_MAX_ENTRIES entries. Fastest lookups;
+  every worker holds (and warms) its own copy.
+- ``shared``: one SQLite database on tmpfs (CACHE_SHARED_PATH), memory-mapped
+  and shared by all workers on the host: one copy per host, and a new worker
+  starts warm. Approximate LRU, bounded to CACHE_MAX_ENTRIES and to
+  CACHE_SHARED_MAX_BYTES (at most half the tmpfs).
+- ``redis``: a Redis-protocol server at CACHE_REDIS_URL (needs the ``redis``
+  package). Size and eviction are the server's ``maxmemory`` settings.
+
+Keys are ``"<namespace>:<...>"`` strings; values anything picklable, treated
+as immutable by callers (the memory backend hands out the stored object).
+Every entry has a TTL and optional tags, and ``invalidate_tags`` drops all
+entries carrying one of them. Hits and misses are counted per worker and
+namespace.
+
+The cache is an optimisation, never a dependency: a backend error (full
+tmpfs, lock timeout, Redis down) is logged and turns into a miss or a no-op.
+"""
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MISSING = object()  # ``get`` default that tells a miss from a cached None
+
+
+class Cache(ABC):
+    """Backend interface; subclasses implement the abstract methods."""
+    backend = ""
+
+    ERROR_LOG_INTERVAL = 60.0  # seconds between logged backend errors
+
+    def __init__(self):
+        self.hits: Counter[str] = Counter()  # per namespace
+        self.misses: Counter[str] = Counter()
+        self.errors = 0
+        self._error_logged = float("-inf")
+
+    def _failed(self, op: str, exc: Exception) -> None:
+        self.errors += 1
+        now = time.monotonic()
+        if now - self._error_logged >= self.ERROR_LOG_INTERVAL:
+            self._error_logged = now
+            print(f"✗ Cache {op} failed ({self.backend}, {self.errors} errors so far): {exc!r}")
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Cached values of ``keys``; missing and expired keys are left out."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        try:
+            found = await self._get_many(keys)
+        except Exception as exc:
+            self._failed("get", exc)
+            found = {}
+        for key in keys:
+            counter = self.hits if key in found else self.misses
+            counter[key.partition(":")[0]] += 1
+        return found
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return (await self.get_many([key])).get(key, default)
+
+    async def set_many(self, items: dict[str, Any], ttl: float, tags: Iterable[str] = ()) -> None:
+        if items:
+            try:
+                await self._set_many(items, ttl, tuple(tags))
+            except Exception as exc:
+                self._failed("set", exc)
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        await self.set_many({key: value}, ttl, tags)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            try:
+                await self._delete(keys)
+            except Exception as exc:
+                self._failed("delete", exc)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Drop every entry tagged with any of ``tags``."""
+        if tags:
+            try:
+                await self._invalidate_tags(tags)
+            except Exception as exc:
+                self._failed("invalidate", exc)
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    async def size(self) -> int | None:
+        """Number of entries, None if the backend can't tell cheaply."""
+        return None
+
+    async def stats(self) -> dict:
+        namespaces = sorted(self.hits.keys() | self.misses.keys())
+        try:
+            entries = await self.size()
+        except Exception as exc:
+            self._failed("size", exc)
+            entries = None
+        return {
+            "backend": self.backend,
+            "entries": entries,
+            "hits": self.hits.total(),
+            "misses": self.misses.total(),
+            "errors": self.errors,
+            "namespaces": {
+                ns: {"hits": self.hits[ns], "misses": self.misses[ns]} for ns in namespaces
+            },
+        }
+
+    @abstractmethod
+    async def _get_many(self, keys: list[str]) -> dict[str, Any]: ...
+
+    @abstractmethod
+    async def _set_many(self, items: dict[str, Any], ttl: float, tags: tuple[str, ...]) -> None: ...
+
+    @abstractmethod
+    async def _delete(self, keys: tuple[str, ...]) -> None: ...
+
+    @abstractmethod
+    async def _invalidate_tags(self, tags: tuple[str, ...]) -> None: ...
+
+
+# ── In-process LRU ──────────────────────────────────────────
+
+class MemoryCache(Cache):
+    backend = "memory"
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        # key -> (expires, value, tags), least recently used first
+        self._entries: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._tagged: dict[str, set[str]] = {}  # tag -> keys
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    async def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                self._remove(key)
+                continue
+            self._entries.move_to_end(key)
+            found[key] = entry[1]
+        return found
+
+    async def _set_many(self, items: dict[str, Any], ttl: float, tags: tuple[str, ...]) -> None:
+        expires = time.monotonic() + ttl
+        for key, value in items.items():
+            self._remove(key)
+            self._entries[key] = (expires, value, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def _delete(self, keys: tuple[str, ...]) -> None:
+        for key in keys:
+            self._remove(key)
+
+    async def _invalidate_tags(self, tags: tuple[str, ...]) -> None:
+        for tag in tags:
+            for key in list(self._tagged.get(tag, ())):
+                self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tagged.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+# ── Host-wide SQLite on tmpfs ───────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES entries (key) ON DELETE CASCADE,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_tags_key ON tags (key);
+"""
+
+
+class SharedCache(Cache):
+    """Values are pickled, so the file must only be writable by this app
+    (it is created with mode 0600).
+
+    Reads never write: LRU stamps of hits are batched into the next ``set``,
+    so only writers take SQLite's write lock, and they give up (a no-op set)
+    after BUSY_TIMEOUT instead of holding up the request.
+    """
+    backend = "shared"
+
+    ACCESS_RESOLUTION = 30.0  # seconds; a hit refreshes its LRU stamp at most this often
+    MMAP_SIZE = 256 * 1024 * 1024
+    BUSY_TIMEOUT = 0.25  # seconds a writer waits for the lock
+    PAGE_SIZE = 4096
+    EVICT_FRACTION = 4  # on a full file, drop 1/4 of the entries (least recently used)
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        # The file (and its WAL) live in RAM: keep them well inside the tmpfs
+        # (Docker's /dev/shm is 64MB by default)
+        fs = os.statvfs(os.path.dirname(path) or ".")
+        self.max_bytes = min(max_bytes, fs.f_frsize * fs.f_blocks // 2)
+        if self.max_bytes < max_bytes:
+            print(f"✓ Shared cache capped at {self.max_bytes >> 20}MB (half of the tmpfs at {path})")
+        self._local = threading.local()  # one connection per thread
+        self._touched: dict[str, float] = {}  # key -> last hit, not yet written
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            conn.execute(f"PRAGMA page_size={self.PAGE_SIZE}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # tmpfs: nothing to sync to
+            conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+            conn.execute(f"PRAGMA max_page_count={self.max_bytes // self.PAGE_SIZE}")
+            conn.execute(f"PRAGMA journal_size_limit={self.max_bytes // 8}")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    def _get_sync(self, keys: list[str]) -> dict[str, Any]:
+        conn = self._conn()
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(
+            f"SELECT key, value, accessed FROM entries WHERE key IN ({placeholders}) AND expires > ?",
+            (*keys, now),
+        ).fetchall()
+        for key, _, accessed in rows:
+            if now - accessed > self.ACCESS_RESOLUTION:
+                self._touched[key] = now
+        return {key: pickle.loads(value) for key, value, _ in rows}
+
+    def _set_sync(self, items: dict[str, Any], ttl: float, tags: tuple[str, ...]) -> None:
+        now = time.time()
+        rows = [(k, pickle.dumps(v, pickle.HIGHEST_PROTOCOL), now + ttl, now) for k, v in items.items()]
+        conn = self._conn()
+        try:
+            self._write(conn, items, rows, tags, now)
+        except sqlite3.OperationalError as exc:
+            if "full" not in str(exc):
+                raise
+            # Hit max_page_count (or the tmpfs itself): make room, retry once
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed "
+                f"LIMIT (SELECT count(*) FROM entries) / {self.EVICT_FRACTION} + 1)"
+            )
+            self._write(conn, items, rows, tags, now)
+
+    def _write(
+        self, conn: sqlite3.Connection, items: dict[str, Any], rows: list[tuple],
+        tags: tuple[str, ...], now: float,
+    ) -> None:
+        touched, self._touched = self._touched, {}
+        with conn:  # one transaction
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?", [(t, k) for k, t in touched.items()],
+            )
+            # Delete first so the old entry's tags go with it (ON DELETE CASCADE)
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in items])
+            conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO tags VALUES (?, ?)", [(t, k) for k in items for t in tags])
+            excess = conn.execute("SELECT count(*) FROM entries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed LIMIT "
+                    "max(0, (SELECT count(*) FROM entries) - ?))",
+                    (self.max_entries,),
+                )
+
+    def _delete_sync(self, keys: tuple[str, ...]) -> None:
+        self._conn().executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+
+    def _invalidate_sync(self, tags: tuple[str, ...]) -> None:
+        self._conn().execute(
+            "DELETE FROM entries WHERE key IN "
+            f"(SELECT key FROM tags WHERE tag IN ({','.join('?' * len(tags))}))",
+            tags,
+        )
+
+    async def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        return await self._run(self._get_sync, keys)
+
+    async def _set_many(self, items: dict[str, Any], ttl: float, tags: tuple[str, ...]) -> None:
+        await self._run(self._set_sync, items, ttl, tags)
+
+    async def _delete(self, keys: tuple[str, ...]) -> None:
+        await self._run(self._delete_sync, keys)
+
+    async def _invalidate_tags(self, tags: tuple[str, ...]) -> None:
+        await self._run(self._invalidate_sync, tags)
+
+    async def clear(self) -> None:
+        await self._run(lambda: self._conn().execute("DELETE FROM entries"))
+
+    async def size(self) -> int:
+        return await self._run(
+            lambda: self._conn().execute("SELECT count(*) FROM entries").fetchone()[0]
+        )
+
+
+# ── Redis protocol ──────────────────────────────────────────
+
+class RedisCache(Cache):
+    backend = "redis"
+
+    PREFIX = "portfolio:"
+    TAG_TTL = 24 * 3600  # tag sets outlive any entry; stale members are harmless
+    TIMEOUT = 0.5  # seconds
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)") from exc
+        # Fail fast when the server is down: a cache error is a miss, not a hang
+        self._redis = aioredis.from_url(url, socket_connect_timeout=self.TIMEOUT, socket_timeout=self.TIMEOUT)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.PREFIX}tag:{tag}"
+
+    async def _get_many(self, keys: list[str]) -> dict[str, Any]:
+        values = await self._redis.mget([self.PREFIX + k for k in keys])
+        return {k: pickle.loads(v) for k, v in zip(keys, values) if v is not None}
+
+    async def _set_many(self, items: dict[str, Any], ttl: float, tags: tuple[str, ...]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self.PREFIX + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), *(self.PREFIX + k for k in items))
+            pipe.expire(self._tag_key(tag), self.TAG_TTL)
+        await pipe.execute()
+
+    async def _delete(self, keys: tuple[str, ...]) -> None:
+        await self._redis.delete(*(self.PREFIX + k for k in keys))
+
+    async def _invalidate_tags(self, tags: tuple[str, ...]) -> None:
+        tag_keys = [self._tag_key(t) for t in tags]
+        pipe = self._redis.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = set().union(*await pipe.execute())
+        await self._redis.delete(*members, *tag_keys)
+
+    async def clear(self) -> None:
+        keys = [k async for k in self._redis.scan_iter(match=f"{self.PREFIX}*", count=1000)]
+        if keys:
+            await self._redis.delete(*keys)
+
+
+@lru_cache
+def get_cache() -> Cache:
+    """The configured cache (one instance per worker)."""
+    if settings.cache_backend == "shared":
+        return SharedCache(
+            settings.CACHE_SHARED_PATH, settings.CACHE_MAX_ENTRIES, settings.CACHE_SHARED_MAX_BYTES,
+        )
+    if settings.cache_backend == "redis":
+        return RedisCache(settings.CACHE_REDIS_URL)
+    return MemoryCache(settings.CACHE_MAX_ENTRIES)
@@ -1,9 +1,18 @@
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
+from app.core.admission import remaining_seconds
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -21,9 +30,67 @@ async_session_factory = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# ── Statement deadline ──────────────────────────────────────
+# Transactions opened while serving a request inherit its remaining time
+# budget (app.core.admission) as statement_timeout. SET LOCAL ends with the
+# transaction, so pooled connections go back clean.
+
+MIN_STATEMENT_TIMEOUT_MS = 50
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_deadline(session, transaction, connection) -> None:
+    remaining = remaining_seconds()
+    if remaining is None:
+        return
+    timeout_ms = max(int(remaining * 1000), MIN_STATEMENT_TIMEOUT_MS)
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def is_statement_timeout(exc: DBAPIError) -> bool:
+    """True if Postgres cancelled the statement (statement_timeout / SQLSTATE 57014)."""
+    return getattr(exc.orig, "sqlstate", None) == "57014"
+
+
+# ── Read replica (optional) ─────────────────────────────────
+# Public read routes use get_read_db; everything else stays on the primary.
+
+replica_engine = None
+replica_session_factory = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        settings.async_replica_url,
+        echo=settings.DEBUG,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,  # health check on checkout: dead connections fail over fast
+        connect_args={"timeout": settings.DB_REPLICA_CONNECT_TIMEOUT},
+    )
+    replica_session_factory = async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+_replica_down_until = 0.0
+
+
+def _mark_replica_down(exc: BaseException) -> None:
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+    print(f"✗ Read replica unavailable, using primary for {settings.DB_REPLICA_RETRY_SECONDS}s: {exc!r}")
+
+
+def replica_available() -> bool:
+    return replica_session_factory is not None and time.monotonic() >= _replica_down_until
+
 
 async def get_db() -> AsyncSession:
-    """FastAPI dependency — yields an async DB session."""
+    """FastAPI dependency — yields an async DB session.
+
+    Commits when the endpoint returns, then runs the ``after_commit`` callbacks;
+    both happen before the response is sent.
+    """
     async with async_session_factory() as session:
         try:
             yield session
@@ -31,3 +98,55 @@ async def get_db() -> AsyncSession:
         except Exception:
             await session.rollback()
             raise
+        for fn in session.info.pop("after_commit", ()):
+            await fn()
+
+
+def after_commit(session: AsyncSession, fn: Callable[[], Awaitable]) -> None:
+    """Await ``fn()`` once ``get_db`` has committed ``session``."""
+    session.info.setdefault("after_commit", []).append(fn)
+
+
+async def _open_replica_session() -> AsyncSession | None:
+    """Open a replica session with a live connection, or None if the replica is down."""
+    session = replica_session_factory()
+    try:
+        await session.connection()
+    except (DBAPIError, OSError, TimeoutError) as exc:
+        await session.close()
+        _mark_replica_down(exc)
+        return None
+    return session
+
+
+@asynccontextmanager
+async def read_session(request: Request):
+    """Read-only session for public reads.
+
+    Uses the replica when configured and healthy, falling back to the primary.
+    Logged-in admins always read from the primary so they see their own writes
+    despite replication lag; only a session cookie that verifies counts, so a
+    made-up one can't push public reads onto the primary.
+    """
+    from app.core.security import admin_session
+
+    if replica_available() and not admin_session(request):
+        session = await _open_replica_session()
+        if session is not None:
+            async with session:
+                try:
+                    yield session
+                except DBAPIError as exc:
+                    if exc.connection_invalidated:
+                        _mark_replica_down(exc)
+                    raise
+            return
+
+    async with async_session_factory() as session:
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """FastAPI dependency — read-only session for public routes (see read_session)."""
+    async with read_session(request) as session:
+        yield session
@@ -1,4 +1,49 @@
+import hashlib
+import hmac
+from contextvars import ContextVar
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
 
 limiter = Limiter(key_func=get_remote_address)
+
+# ── Prewarm exemption ───────────────────────────────────────
+# The cache pre-warmer (app.services.prewarm) sends PREWARM_HEADER with a
+# token derived from SECRET_KEY; such requests skip per-IP rate limits
+# (``exempt_when=is_prewarm_request``). Admission control still applies.
+
+PREWARM_HEADER = "x-prewarm-token"
+
+_prewarm_request: ContextVar[bool] = ContextVar("prewarm_request", default=False)
+
+
+def prewarm_token() -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), b"prewarm", hashlib.sha256).hexdigest()
+
+
+def is_prewarm_request() -> bool:
+    return _prewarm_request.get()
+
+
+class PrewarmMarkerMiddleware:
+    """Flags requests carrying a valid prewarm token for ``is_prewarm_request``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.token = prewarm_token().encode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        sent = dict(scope["headers"]).get(PREWARM_HEADER.encode(), b"")
+        token = _prewarm_request.set(hmac.compare_digest(sent, self.token))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _prewarm_request.reset(token)
@@ -7,7 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
+from app.core.tenancy import get_tenant
 from app.models.user import AdminUser
+from app.schemas.tenant import TenantInfo
 
 settings = get_settings()
 
@@ -25,8 +27,8 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
-def create_session_token(user_id: int) -> str:
-    return serializer.dumps({"uid": user_id})
+def create_session_token(user_id: int, tenant_id: int) -> str:
+    return serializer.dumps({"uid": user_id, "tid": tenant_id})
 
 
 def decode_session_token(token: str) -> dict | None:
@@ -36,22 +38,39 @@ def decode_session_token(token: str) -> dict | None:
         return None
 
 
+def admin_session(request: Request) -> dict | None:
+    """Payload of the request's session cookie if its signature verifies
+    (no DB lookup), else None."""
+    token = request.cookies.get(SESSION_COOKIE)
+    return decode_session_token(token) if token else None
+
+
+def is_admin_request(request: Request, tenant: TenantInfo) -> bool:
+    """Whether the request carries a valid admin session for the tenant.
+    Public reads skip the app cache for these, so admins see their own
+    writes at once."""
+    payload = admin_session(request)
+    return bool(payload) and payload.get("tid") == tenant.id
+
+
 async def get_current_admin(
     request: Request,
+    tenant: TenantInfo = Depends(get_tenant),
     db: AsyncSession = Depends(get_db),
 ) -> AdminUser:
     """Dependency: extracts admin user from session cookie.
-    Redirects to login page if not authenticated."""
+    Redirects to login page if not authenticated for this host's tenant."""
     token = request.cookies.get(SESSION_COOKIE)
     if not token:
         raise _redirect_to_login()
 
     payload = decode_session_token(token)
-    if not payload:
+    if not payload or payload.get("tid") != tenant.id:
         raise _redirect_to_login()
 
     stmt = select(AdminUser).where(
         AdminUser.id == payload["uid"],
+        AdminUser.tenant_id == tenant.id,
         AdminUser.is_active.is_(True),
     )
     result = await db.execute(stmt)
@@ -0,0 +1,50 @@
+"""Single-flight: concurrent callers of the same operation share one run.
+
+``single_flight(key, fn)`` starts ``fn()`` for the first caller of ``key``;
+callers arriving while it runs await the same task instead of starting their
+own, so a burst of identical cache misses costs one query and one pooled
+connection. The task is shielded: a caller that goes away doesn't cancel it
+for the others. Results are shared between callers, so ``fn`` returns plain
+data (dicts, lists), never ORM objects, and opens its own session rather than
+borrowing a request's. Coalescing is per worker; the app cache spreads the
+result further.
+"""
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_flights: dict[str, asyncio.Task] = {}
+runs: Counter[str] = Counter()  # per namespace: computations started
+joins: Counter[str] = Counter()  # per namespace: callers that awaited one in flight
+
+
+def _done(key: str, task: asyncio.Task) -> None:
+    if _flights.get(key) is task:
+        del _flights[key]
+    if not task.cancelled():
+        task.exception()  # retrieved even if every caller went away
+
+
+async def single_flight(key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    namespace = key.partition(":")[0]
+    task = _flights.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fn())
+        _flights[key] = task
+        task.add_done_callback(lambda t: _done(key, t))
+        runs[namespace] += 1
+    else:
+        joins[namespace] += 1
+    return await asyncio.shield(task)
+
+
+def flight_stats() -> dict:
+    return {
+        "in_flight": len(_flights),
+        "namespaces": {
+            ns: {"runs": runs[ns], "joins": joins[ns]} for ns in sorted(runs.keys() | joins.keys())
+        },
+    }
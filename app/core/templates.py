@@ -1,17 +1,57 @@
 """Shared Jinja2 templates instance with custom filters."""
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
 from fastapi.templating import Jinja2Templates
-from app.services.s3 import get_presigned_read_url
+from app.services.image_variants import grid_sizes, srcset
+from app.services.s3 import safe_s3url
+
+STATIC_DIR = Path("app/static")
+
+# main.css sections needed for the first paint of the homepage (header + grid);
+# everything else loads asynchronously.
+CRITICAL_CSS_SECTIONS = {
+    "RESET & VARIABLES", "HEADER", "NAV", "MAIN CONTENT", "PORTFOLIO GRID",
+    "ARTWORK DETAIL", "LOADING PLACEHOLDER",
+}
+_CSS_SECTION_RE = re.compile(r"/\* =+ (.+?) =+ \*/")
+
+
+@lru_cache
+def static_hash(path: str) -> str:
+    """Short content hash of a file under app/static (computed once per process)."""
+    return hashlib.sha256((STATIC_DIR / path).read_bytes()).hexdigest()[:12]
+
+
+def static_url(path: str) -> str:
+    """Jinja2 global: cache-busted URL for a static asset."""
+    return f"/static/{path}?v={static_hash(path)}"
+
+
+def _minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
 
+@lru_cache
+def critical_css(path: str = "css/main.css") -> str:
+    """Jinja2 global: the CRITICAL_CSS_SECTIONS of a stylesheet, minified for inlining.
 
-def _safe_s3url(key: str, expires: int = 3600) -> str:
-    """Jinja2 filter: convert S3 key to presigned read URL. Never raises."""
-    try:
-        if not key:
-            return ""
-        return get_presigned_read_url(key, expires)
-    except Exception:
-        return key  # fallback to raw key
+    Sections are delimited by the ``/* ==== NAME ==== */`` banners in main.css.
+    Extracted once per process (warmed at startup).
+    """
+    parts = _CSS_SECTION_RE.split((STATIC_DIR / path).read_text(encoding="utf-8"))
+    # parts = [preamble, name, body, name, body, ...]
+    sections = zip(parts[1::2], parts[2::2])
+    return _minify_css("".join(body for name, body in sections if name.strip() in CRITICAL_CSS_SECTIONS))
 
 
 templates = Jinja2Templates(directory="app/templates")
-templates.env.filters["s3url"] = _safe_s3url
+templates.env.filters["s3url"] = safe_s3url
+templates.env.filters["srcset"] = srcset
+templates.env.globals["grid_sizes"] = grid_sizes
+templates.env.globals["static_url"] = static_url
+templates.env.globals["critical_css"] = critical_css
@@ -0,0 +1,144 @@
+"""Tenant resolution: maps the request's Host header to a tenant.
+
+Custom domains match ``Tenant.host``; subdomains of ``TENANT_BASE_DOMAIN``
+match ``Tenant.slug``. With MULTI_TENANT off every request belongs to the
+default tenant. Lookups are cached (app cache) for TENANT_CACHE_TTL seconds.
+
+Bogus Host headers never reach the app cache: hosts that are neither a slug
+under TENANT_BASE_DOMAIN nor a known custom domain (a per-worker set,
+reloaded every TENANT_CACHE_TTL) are rejected up front, and unknown slugs are
+remembered in a small per-worker LRU, so they can't evict real entries or
+write to a shared backend.
+"""
+import re
+import time
+
+from fastapi import HTTPException, Request
+from sqlalchemy import or_, select
+
+from app.core.cache import MemoryCache, get_cache
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.singleflight import single_flight
+from app.models.tenant import DEFAULT_TENANT_ID, Tenant
+from app.schemas.tenant import TenantInfo
+
+settings = get_settings()
+
+CACHE_TAG = "tenants"
+TENANT_SLUG_RE = re.compile(r"^[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$")  # one DNS label
+UNKNOWN_HOSTS_MAX = 1000  # per worker
+
+_unknown_hosts = MemoryCache(UNKNOWN_HOSTS_MAX)
+_custom_hosts: frozenset[str] = frozenset()
+_custom_hosts_expires = 0.0
+
+
+def normalize_host(host: str) -> str:
+    host = host.partition(":")[0].strip().lower().rstrip(".")
+    return host.removeprefix("www.")
+
+
+def tenant_key_prefix(slug: str) -> str:
+    """Bucket prefix for a new tenant's uploads and published site."""
+    return f"{settings.TENANT_BUCKET_ROOT}{slug}/"
+
+
+def owns_key(tenant: TenantInfo, key: str) -> bool:
+    """Whether a bucket key is the tenant's media: under its prefix, but not
+    another tenant's (the default tenant's prefix is the bucket root) and not
+    its published static site."""
+    if not key.startswith(tenant.bucket_prefix):
+        return False
+    rest = key[len(tenant.bucket_prefix):]
+    return not rest.startswith((settings.TENANT_BUCKET_ROOT, settings.STATIC_SITE_PREFIX))
+
+
+async def _lookup(host: str) -> TenantInfo | None:
+    stmt = select(Tenant).where(Tenant.is_active.is_(True))
+    if not settings.MULTI_TENANT:
+        stmt = stmt.where(Tenant.id == DEFAULT_TENANT_ID)
+    else:
+        match = [Tenant.host == host]
+        base = settings.TENANT_BASE_DOMAIN.lower()
+        if base and host.endswith(f".{base}"):
+            match.append(Tenant.slug == host[: -len(base) - 1])
+        # A custom domain wins over a slug that happens to match
+        stmt = stmt.where(or_(*match)).order_by((Tenant.host == host).desc()).limit(1)
+    async with async_session_factory() as session:
+        tenant = (await session.execute(stmt)).scalar_one_or_none()
+    return TenantInfo.model_validate(tenant) if tenant else None
+
+
+async def _load_custom_hosts() -> frozenset[str]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(Tenant.host).where(Tenant.is_active.is_(True), Tenant.host.is_not(None))
+        )
+        return frozenset(normalize_host(h) for h in result.scalars())
+
+
+async def _may_be_tenant(host: str) -> bool:
+    """Whether ``host`` can name a tenant at all: a slug under
+    TENANT_BASE_DOMAIN or one of the tenants' custom domains."""
+    global _custom_hosts, _custom_hosts_expires
+
+    base = settings.TENANT_BASE_DOMAIN.lower()
+    if base and host.endswith(f".{base}"):
+        return bool(TENANT_SLUG_RE.match(host[: -len(base) - 1]))
+    if time.monotonic() >= _custom_hosts_expires:
+        _custom_hosts = await single_flight("tenant_hosts", _load_custom_hosts)
+        _custom_hosts_expires = time.monotonic() + settings.TENANT_CACHE_TTL
+    return host in _custom_hosts
+
+
+async def resolve_tenant(host: str) -> TenantInfo | None:
+    """Cached Host -> tenant lookup; None for unknown or inactive tenants."""
+    host = normalize_host(host) if settings.MULTI_TENANT else ""
+    if settings.MULTI_TENANT and not await _may_be_tenant(host):
+        return None
+    if await _unknown_hosts.get(host):
+        return None
+    cache = get_cache()
+    key = f"tenant:{host}"
+    tenant = await cache.get(key)
+    if tenant is None:
+        tenant = await _lookup(host)
+        if tenant is None:
+            await _unknown_hosts.set(host, True, settings.TENANT_CACHE_TTL)
+            return None
+        await cache.set(key, tenant, settings.TENANT_CACHE_TTL, [CACHE_TAG])
+    return tenant
+
+
+async def clear_tenant_cache() -> None:
+    """Drop cached lookups (other workers' unknown-host memos expire on their own)."""
+    global _custom_hosts_expires
+
+    _custom_hosts_expires = 0.0
+    await _unknown_hosts.clear()
+    await get_cache().invalidate_tags(CACHE_TAG)
+
+
+async def get_tenant(request: Request) -> TenantInfo:
+    """FastAPI dependency — the tenant that owns the requested host."""
+    tenant = await resolve_tenant(request.headers.get("host", ""))
+    if tenant is None:
+        raise HTTPException(status_code=404, detail="Unknown site")
+    return tenant
+
+
+async def list_active_tenants() -> list[TenantInfo]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(Tenant).where(Tenant.is_active.is_(True)).order_by(Tenant.id)
+        )
+        return [TenantInfo.model_validate(t) for t in result.scalars()]
+
+
+async def get_tenant_by_slug(slug: str) -> TenantInfo | None:
+    """Uncached lookup for scripts (``--tenant`` arguments)."""
+    async with async_session_factory() as session:
+        result = await session.execute(select(Tenant).where(Tenant.slug == slug))
+        tenant = result.scalar_one_or_none()
+    return TenantInfo.model_validate(tenant) if tenant else None
@@ -1,43 +1,102 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.exc import DBAPIError
 
+from app.core.admission import AdmissionControlMiddleware, overloaded_response
 from app.core.config import get_settings
-from app.core.limiter import limiter
+from app.core.limiter import PrewarmMarkerMiddleware, limiter
 from app.core.security import _RedirectException
-from app.services.s3 import get_presigned_read_url
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 settings = get_settings()
 
+# Reported as "imports" at startup: the routers (and most of the app) are imported below
+_boot_started = time.perf_counter()
+
+
+async def _warm_db_pool() -> None:
+    """Open a few pooled connections up front so the first request doesn't connect."""
+    from app.core.database import engine, replica_engine
+
+    for eng in filter(None, (engine, replica_engine)):
+        conns = await asyncio.gather(
+            *(eng.connect() for _ in range(settings.DB_POOL_WARM_CONNECTIONS))
+        )
+        for conn in conns:
+            await conn.close()
+
+
+def _warm_templates() -> None:
+    from app.core.templates import critical_css, templates
+
+    critical_css("css/main.css")
+    for name in (
+        "base.html", "public/index.html", "public/_grid_item.html",
+        "public/work_detail.html", "public/404.html",
+    ):
+        templates.get_template(name)
+
+
+async def _prewarm_worker(app: FastAPI) -> None:
+    """Request every tenant's pages in-process, so this worker's caches are
+    warm before real visitors arrive (PREWARM_ON_STARTUP)."""
+    from app.services.prewarm import make_client, prewarm_tenant, served_tenants, summary_line
+
+    async with make_client(app) as client:
+        for tenant in await served_tenants():
+            try:
+                print(summary_line(tenant, await prewarm_tenant(client, tenant)))
+            except Exception as exc:
+                print(f"✗ Prewarm failed ({tenant.slug}): {exc!r}")
+
+
+async def _timed(label: str, timings: list[str], coro) -> None:
+    started = time.perf_counter()
+    try:
+        await coro
+        timings.append(f"{label} {(time.perf_counter() - started) * 1000:.0f}ms")
+    except Exception as exc:
+        timings.append(f"{label} failed ({exc!r})")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    from app.core.database import async_session_factory
-    from app.core.security import hash_password
-    from app.models.user import AdminUser
-    from sqlalchemy import select
-
-    async with async_session_factory() as session:
-        stmt = select(AdminUser).where(AdminUser.email == settings.ADMIN_EMAIL)
-        result = await session.execute(stmt)
-        if not result.scalar_one_or_none():
-            admin = AdminUser(
-                email=settings.ADMIN_EMAIL,
-                password_hash=hash_password(settings.ADMIN_PASSWORD),
-                is_active=True,
-            )
-            session.add(admin)
-            await session.commit()
-            print(f"✓ Seeded admin user: {settings.ADMIN_EMAIL}")
-        else:
-            print(f"✓ Admin user exists: {settings.ADMIN_EMAIL}")
+    # Migrations and the admin seed run once per deploy (scripts/release.py),
+    # not here in every worker.
+    from app.services.analytics import flush_counters, run_flusher
+    from app.services.s3 import get_s3_client
+
+    imports_ms = (time.perf_counter() - _boot_started) * 1000
+    started = time.perf_counter()
+    timings: list[str] = []
+    await asyncio.gather(
+        _timed("db pool", timings, _warm_db_pool()),
+        _timed("s3 client", timings, asyncio.to_thread(get_s3_client)),
+        _timed("templates", timings, asyncio.to_thread(_warm_templates)),
+    )
+    total_ms = (time.perf_counter() - started) * 1000
+    print(f"✓ Startup: imports {imports_ms:.0f}ms, warm-up {total_ms:.0f}ms ({', '.join(timings)})")
 
+    background = [asyncio.create_task(run_flusher())]
+    if settings.PREWARM_ON_STARTUP:
+        background.append(asyncio.create_task(_prewarm_worker(app)))
     yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    flushed = await flush_counters()
+    print(f"✓ Shutdown: flushed {flushed} pending view counters")
+    if settings.IMAGE_TRANSFORM_ENABLED:
+        from app.services.image_variants import shutdown_pool
+
+        shutdown_pool()
 
 
 app = FastAPI(
@@ -57,6 +116,22 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 async def redirect_to_login(request: Request, exc: _RedirectException):
     return RedirectResponse(url="/admin/login", status_code=303)
 
+# ── Statement deadline exceeded → 503 ──────────────────────
+@app.exception_handler(DBAPIError)
+async def db_error_handler(request: Request, exc: DBAPIError):
+    from app.core.database import is_statement_timeout
+
+    if is_statement_timeout(exc):
+        return overloaded_response(request.url.path)
+    raise exc
+
+# ── Admission control (inside CORS, so 503s keep CORS headers) ─
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# ── Prewarm token → rate-limit exemption ────────────────────
+app.add_middleware(PrewarmMarkerMiddleware)
+
 # ── CORS ────────────────────────────────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -80,6 +155,16 @@ app.include_router(admin_api_router)
 app.include_router(admin_pages_router)
 app.include_router(pages_router)
 
+if settings.MEDIA_PROXY_ENABLED:
+    from app.api.media import router as media_router
+
+    app.include_router(media_router)
+
+if settings.IMAGE_TRANSFORM_ENABLED:
+    from app.api.images import router as images_router
+
+    app.include_router(images_router)
+
 
 # ── Custom 404 ──────────────────────────────────────────────
 @app.exception_handler(404)
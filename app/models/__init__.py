@@ -1,6 +1,12 @@
+from app.models.analytics import WorkViewCount
 from app.models.base import Base
+from app.models.media import MediaObject
 from app.models.settings import SiteSettings
+from app.models.tenant import Tenant
 from app.models.user import AdminUser
-from app.models.work import Work
+from app.models.work import Work, WorkMedia
 
-__all__ = ["Base", "AdminUser", "SiteSettings", "Work"]
+__all__ = [
+    "Base", "AdminUser", "MediaObject", "SiteSettings", "Tenant", "Work", "WorkMedia",
+    "WorkViewCount",
+]
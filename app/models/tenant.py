@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+DEFAULT_TENANT_ID = 1  # created by the migration; owns all pre-tenancy rows
+
+
+class Tenant(Base):
+    __tablename__ = "tenants"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    slug: Mapped[str] = mapped_column(String(63), unique=True, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    # Custom domain, e.g. "anna.art"; subdomains of TENANT_BASE_DOMAIN resolve by slug
+    host: Mapped[str | None] = mapped_column(String(255), unique=True, nullable=True)
+    # Prepended to every uploaded/published key, e.g. "tenants/anna/"
+    bucket_prefix: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Tenant slug={self.slug!r}>"
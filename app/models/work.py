@@ -1,26 +1,77 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
+MEDIA_POSITION_STEP = 1024  # gap between gallery positions, so inserts don't renumber
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".mov")
+
+
+def media_kind(key: str) -> str:
+    return "video" if key.lower().endswith(VIDEO_EXTENSIONS) else "image"
+
+
+class WorkMedia(Base):
+    """One gallery item of a work, ordered by ``position``."""
+    __tablename__ = "work_media"
+    __table_args__ = (
+        Index("ix_work_media_work_position", "work_id", "position"),
+        Index("ix_work_media_key", "key"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    work_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("works.id", ondelete="CASCADE"), nullable=False,
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    key: Mapped[str] = mapped_column(String(512), nullable=False)
+    kind: Mapped[str] = mapped_column(String(10), nullable=False, default="image")  # image | video
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)  # bytes
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"<WorkMedia key={self.key!r} position={self.position}>"
+
 
 class Work(Base):
     __tablename__ = "works"
+    __table_args__ = (
+        Index("uq_works_tenant_slug", "tenant_id", "slug", unique=True),
+        Index("ix_works_tenant_order", "tenant_id", "sort_order", "created_at"),
+        Index("ix_works_tenant_cover", "tenant_id", "cover_url"),  # key_references
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    slug: Mapped[str] = mapped_column(String(120), unique=True, nullable=False, index=True)
+    tenant_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False,
+    )
+    slug: Mapped[str] = mapped_column(String(120), nullable=False)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     year: Mapped[int | None] = mapped_column(Integer, nullable=True)
     tags: Mapped[list[str]] = mapped_column(ARRAY(String), default=list, server_default="{}")
     cover_url: Mapped[str] = mapped_column(String(512), nullable=False, default="")
-    gallery_urls: Mapped[list[str]] = mapped_column(ARRAY(String), default=list, server_default="{}")
+
+    # Gallery; not loaded implicitly — query with selectinload(Work.media) where needed
+    media: Mapped[list[WorkMedia]] = relationship(
+        order_by=WorkMedia.position,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql",
+    )
 
     # Grid layout hints (for bento grid)
     span_class: Mapped[str] = mapped_column(String(20), default="span-4")
@@ -37,5 +88,24 @@ class Work(Base):
         onupdate=func.now(),
     )
 
+    @property
+    def gallery_urls(self) -> list[str]:
+        """Gallery keys in order (compatibility view of ``media``)."""
+        return [m.key for m in self.media]
+
+    @gallery_urls.setter
+    def gallery_urls(self, keys: list[str]) -> None:
+        """Replace the whole gallery; items whose key stays keep their metadata."""
+        existing: dict[str, list[WorkMedia]] = {}
+        for item in self.media:
+            existing.setdefault(item.key, []).append(item)
+        media = []
+        for i, key in enumerate(keys, start=1):
+            reuse = existing.get(key)
+            item = reuse.pop(0) if reuse else WorkMedia(key=key, kind=media_kind(key))
+            item.position = i * MEDIA_POSITION_STEP
+            media.append(item)
+        self.media = media
+
     def __repr__(self) -> str:
         return f"<Work slug={self.slug!r}>"
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class TenantInfo(BaseModel):
+    """Detached, immutable tenant config (safe to cache across requests)."""
+    id: int
+    slug: str
+    name: str
+    host: str | None
+    bucket_prefix: str
+
+    model_config = {"from_attributes": True, "frozen": True}
@@ -2,9 +2,12 @@ import re
 import uuid
 from datetime import datetime
 
+from typing import Literal
+
 from pydantic import BaseModel, field_validator
 
 SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9\-]{1,118}[a-z0-9]$")
+RESERVED_SLUGS = {"batch", "stream"}  # literal paths under /api/works/
 
 
 class WorkBase(BaseModel):
@@ -26,6 +29,8 @@ class WorkBase(BaseModel):
                 "Slug must be 3-120 chars, only a-z 0-9 and hyphens, "
                 "must start/end with alphanumeric"
             )
+        if v in RESERVED_SLUGS:
+            raise ValueError(f"Slug {v!r} is reserved")
         return v
 
     @field_validator("year")
@@ -67,11 +72,89 @@ class WorkListItem(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class WorkMediaItem(BaseModel):
+    id: uuid.UUID
+    key: str
+    kind: str
+    width: int | None
+    height: int | None
+    size: int | None
+
+    model_config = {"from_attributes": True}
+
+
+class WorkMediaUpdate(BaseModel):
+    kind: Literal["image", "video"] | None = None
+    width: int | None = None
+    height: int | None = None
+    size: int | None = None
+    index: int | None = None  # move to this gallery index
+
+    @field_validator("index")
+    @classmethod
+    def validate_index(cls, v: int | None) -> int | None:
+        if v is not None and v < 0:
+            raise ValueError("Index must be >= 0")
+        return v
+
+
+class WorkMediaCreate(WorkMediaUpdate):
+    key: str
+    # kind defaults to the key's extension; index defaults to appending
+
+
 class WorkDetail(WorkListItem):
     description: str | None
     gallery_urls: list[str]
+    media: list[WorkMediaItem] = []
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
 
+
+class RelatedWork(BaseModel):
+    slug: str
+    title: str
+    cover_url: str
+    year: int | None
+
+
+class WorkMediaPublic(WorkMediaItem):
+    url: str  # client-facing media URL for ``key``
+
+
+class WorkPublicDetail(WorkDetail):
+    media: list[WorkMediaPublic] = []
+    related: list[RelatedWork] = []
+
+
+class WorkReorderItem(BaseModel):
+    id: uuid.UUID
+    sort_order: int
+
+
+class WorkReorder(BaseModel):
+    items: list[WorkReorderItem]
+
+    @field_validator("items")
+    @classmethod
+    def validate_unique_ids(cls, v: list[WorkReorderItem]) -> list[WorkReorderItem]:
+        if len({item.id for item in v}) != len(v):
+            raise ValueError("Each work may appear only once")
+        return v
+
+
+class WorkBulkDelete(BaseModel):
+    ids: list[uuid.UUID]
+
+
+class WorkBulkTags(BaseModel):
+    ids: list[uuid.UUID]
+    add: list[str] = []
+    remove: list[str] = []
+    replace: list[str] | None = None  # if set, overrides add/remove
+
+
+class BulkResult(BaseModel):
+    affected: int
@@ -0,0 +1,98 @@
+"""Write-behind view/click counters.
+
+Hits are counted in this worker's memory (no I/O on the request path) and
+flushed every ANALYTICS_FLUSH_SECONDS as one upsert into ``work_views``, with
+a final flush on shutdown. Counters are keyed by ``(tenant_id, slug)`` so the
+click beacon needs no lookup; the flush joins them to ``works``, which drops
+unknown slugs.
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.limiter import is_prewarm_request
+
+settings = get_settings()
+
+VIEW, CLICK = 0, 1
+
+_pending: dict[tuple[int, str], list[int]] = {}  # (tenant_id, slug) -> [views, clicks]
+
+_UPSERT = text("""
+    INSERT INTO work_views (work_id, views, clicks, updated_at)
+    SELECT w.id, c.views, c.clicks, now()
+    FROM unnest(
+        CAST(:tenant_ids AS integer[]), CAST(:slugs AS varchar[]),
+        CAST(:views AS bigint[]), CAST(:clicks AS bigint[])
+    ) AS c(tenant_id, slug, views, clicks)
+    JOIN works w ON w.tenant_id = c.tenant_id AND w.slug = c.slug
+    ON CONFLICT (work_id) DO UPDATE SET
+        views = work_views.views + EXCLUDED.views,
+        clicks = work_views.clicks + EXCLUDED.clicks,
+        updated_at = EXCLUDED.updated_at
+""")
+
+
+def _record(tenant_id: int, slug: str, kind: int) -> None:
+    if is_prewarm_request():
+        return  # the cache pre-warmer is not a visitor
+    counts = _pending.get((tenant_id, slug))
+    if counts is None:
+        if len(_pending) >= settings.ANALYTICS_MAX_PENDING:
+            return  # flood of distinct (likely bogus) slugs: drop until the next flush
+        counts = _pending[(tenant_id, slug)] = [0, 0]
+    counts[kind] += 1
+
+
+def record_view(tenant_id: int, slug: str) -> None:
+    _record(tenant_id, slug, VIEW)
+
+
+def record_click(tenant_id: int, slug: str) -> None:
+    _record(tenant_id, slug, CLICK)
+
+
+def _merge_back(batch: dict[tuple[int, str], list[int]]) -> None:
+    for key, (views, clicks) in batch.items():
+        counts = _pending.setdefault(key, [0, 0])
+        counts[VIEW] += views
+        counts[CLICK] += clicks
+
+
+async def flush_counters() -> int:
+    """Write pending counts in one statement; returns the number of keys flushed.
+
+    On failure the counts are kept for the next flush.
+    """
+    global _pending
+    if not _pending:
+        return 0
+    batch, _pending = _pending, {}
+    keys = list(batch)
+    params = {
+        "tenant_ids": [tenant_id for tenant_id, _ in keys],
+        "slugs": [slug for _, slug in keys],
+        "views": [batch[k][VIEW] for k in keys],
+        "clicks": [batch[k][CLICK] for k in keys],
+    }
+    try:
+        async with async_session_factory() as session:
+            await session.execute(_UPSERT, params)
+            await session.commit()
+    except asyncio.CancelledError:
+        _merge_back(batch)
+        raise
+    except Exception as exc:
+        _merge_back(batch)
+        print(f"✗ Analytics flush failed, will retry: {exc!r}")
+        return 0
+    return len(batch)
+
+
+async def run_flusher() -> None:
+    """Lifespan task: flush every ANALYTICS_FLUSH_SECONDS until cancelled."""
+    while True:
+        await asyncio.sleep(settings.ANALYTICS_FLUSH_SECONDS)
+        await flush_counters()
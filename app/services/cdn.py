@@ -0,0 +1,79 @@
+"""CDN cache purge hooks.
+
+Public pages are tagged with per-tenant surrogate keys (``site-<tenant>``,
+``work-<tenant>-<slug>``) via ``CDN_SURROGATE_HEADER``, so purging one
+portfolio leaves the others cached. Admin writes purge those tags plus the
+CDN URLs of media that was replaced or deleted. The purge endpoint receives
+a Cloudflare-style body: ``{"files": [...], "tags": [...]}``.
+
+App cache entries derived from a page's data carry the same tags;
+``schedule_purge`` drops them as soon as the write commits, before the
+response, and purges the CDN in the background.
+"""
+from collections.abc import Iterable
+from functools import partial
+
+import httpx
+from fastapi import BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_cache
+from app.core.config import get_settings
+from app.core.database import after_commit
+from app.schemas.tenant import TenantInfo
+from app.services.s3 import get_cdn_url
+
+settings = get_settings()
+
+
+def site_tag(tenant: TenantInfo) -> str:
+    return f"site-{tenant.slug}"
+
+
+def work_tag(tenant: TenantInfo, slug: str) -> str:
+    return f"work-{tenant.slug}-{slug}"
+
+
+def surrogate_headers(tenant: TenantInfo, *tags: str) -> dict[str, str]:
+    """Response headers that tag a public page for later purging."""
+    return {settings.CDN_SURROGATE_HEADER: " ".join((site_tag(tenant), *tags))}
+
+
+def work_media_keys(work) -> set[str]:
+    return {k for k in (work.cover_url, *work.gallery_urls) if k}
+
+
+def schedule_purge(
+    db: AsyncSession, background_tasks: BackgroundTasks,
+    keys: Iterable[str] = (), tags: Iterable[str] = (),
+) -> None:
+    """Drop ``tags`` from the app cache once ``db`` commits (so the writer's
+    next request reads fresh data), then purge the CDN after the response."""
+    tags = sorted(set(tags))
+    after_commit(db, partial(get_cache().invalidate_tags, *tags))
+    background_tasks.add_task(purge_cdn, set(keys), tags)
+
+
+async def purge_cdn(keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+    """Purge media keys (by CDN URL) and tags at the CDN (skipped if unconfigured)."""
+    tags = sorted(set(tags))
+    if not settings.CDN_PURGE_URL:
+        return
+    files = sorted(filter(None, (get_cdn_url(k) for k in keys)))
+    if not files and not tags:
+        return
+
+    headers = {}
+    if settings.CDN_PURGE_TOKEN:
+        headers["Authorization"] = f"Bearer {settings.CDN_PURGE_TOKEN}"
+    body = {}
+    if files:
+        body["files"] = files
+    if tags:
+        body["tags"] = tags
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            res = await client.post(settings.CDN_PURGE_URL, json=body, headers=headers)
+            res.raise_for_status()
+    except httpx.HTTPError as exc:
+        print(f"✗ CDN purge failed: {exc!r}")
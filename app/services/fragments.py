@@ -0,0 +1,51 @@
+"""Rendered-fragment cache for the homepage grid.
+
+Each work's ``grid-item`` markup is cached (app cache, one lookup per page)
+under ``(work.id, work.updated_at, eager)``, so a homepage render only
+re-renders works edited since they were cached; the page is assembled from
+the cached fragments. Entries expire after FRAGMENT_CACHE_TTL seconds, which
+must stay below the lifetime of presigned URLs baked into the markup (1h).
+Hero covers are rendered fresh: their URL has to match the Link preload header.
+"""
+from markupsafe import Markup
+
+from app.core.cache import get_cache
+from app.core.config import get_settings
+from app.core.templates import templates
+
+settings = get_settings()
+
+EAGER_COVERS = 4  # first grid row loads eagerly (matches public/index.html)
+
+
+def _render(work, hero_url: str | None, eager: bool) -> Markup:
+    template = templates.get_template("public/_grid_item.html")
+    return Markup(template.render(work=work, hero_url=hero_url, eager=eager))
+
+
+def _key(work, eager: bool) -> str:
+    return f"fragment:{work.id}:{work.updated_at.timestamp()}:{int(eager)}"
+
+
+async def render_grid(works, hero_urls: dict[str, str]) -> list[Markup]:
+    """Grid fragments for ``works`` in order, from the cache where possible."""
+    cache = get_cache()
+    keys = {
+        work.id: _key(work, index < EAGER_COVERS)
+        for index, work in enumerate(works) if work.slug not in hero_urls
+    }
+    cached = await cache.get_many(keys.values())
+
+    fragments, rendered = [], {}
+    for index, work in enumerate(works):
+        hero_url = hero_urls.get(work.slug)
+        if hero_url:
+            fragments.append(_render(work, hero_url, True))
+            continue
+        key = keys[work.id]
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = _render(work, None, index < EAGER_COVERS)
+        fragments.append(Markup(html))
+    await cache.set_many(rendered, settings.FRAGMENT_CACHE_TTL)
+    return fragments
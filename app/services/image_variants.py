@@ -0,0 +1,212 @@
+"""On-demand image variants: resized / re-encoded copies of bucket images.
+
+A variant is named by its source key and parameters (``w``, ``h``, ``fit``,
+``fmt``). Source keys are never overwritten, so a variant URL always means the
+same bytes and is served immutable. Lookups go disk, bucket, then transform:
+variants are kept in the byte-bounded media disk cache (never the app cache,
+which is bounded by entry count) and stored in the bucket (IMAGE_VARIANT_PREFIX
+inside the tenant's prefix), so each is transformed once per deployment, not
+once per host or restart.
+
+The source is fetched through the media disk cache (once, shared with the
+/media proxy) and resized in a process pool, IMAGE_TRANSFORM_PROCESSES per
+worker. Concurrent misses for the same variant share one transform.
+
+Unsigned URLs may only use IMAGE_WIDTHS as ``w`` / ``h``, so arbitrary sizes
+can't fill the caches; other sizes, up to IMAGE_MAX_DIMENSION, need the HMAC
+signature that ``image_url`` adds.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import quote, urlencode
+
+from app.core.config import get_settings
+from app.core.singleflight import single_flight
+from app.services.imaging import FITS, FORMATS, transform
+from app.services.media_cache import media_cache
+from app.services.s3 import aupload_file_to_s3, is_not_found, is_private_key
+
+settings = get_settings()
+
+DEFAULT_FIT = "contain"
+DEFAULT_FORMAT = "webp"
+
+
+class InvalidVariant(ValueError):
+    pass
+
+
+class Variant(NamedTuple):
+    key: str
+    w: int | None = None
+    h: int | None = None
+    fit: str = DEFAULT_FIT
+    fmt: str = DEFAULT_FORMAT
+    prefix: str = ""  # bucket prefix of the tenant the variant is stored for
+
+    @property
+    def canonical(self) -> str:
+        return f"{self.key}?w={self.w or ''}&h={self.h or ''}&fit={self.fit}&fmt={self.fmt}"
+
+    @property
+    def media_type(self) -> str:
+        return FORMATS[self.fmt]
+
+    @property
+    def storage_key(self) -> str:
+        """Bucket key of the stored variant, inside the tenant's prefix."""
+        digest = hashlib.sha256(self.canonical.encode("utf-8")).hexdigest()
+        return f"{self.prefix}{settings.IMAGE_VARIANT_PREFIX}{digest}.{self.fmt}"
+
+
+# ── URLs and signatures ────────────────────────────────────
+
+def sign(variant: Variant) -> str:
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), b"img:" + variant.canonical.encode("utf-8"), hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
+
+
+def _whitelisted(variant: Variant) -> bool:
+    return all(d is None or d in settings.image_widths for d in (variant.w, variant.h))
+
+
+def parse_variant(
+    key: str, w: int | None, h: int | None, fit: str | None, fmt: str | None, sig: str | None,
+    prefix: str = "",
+) -> Variant:
+    """Validate request parameters; raises InvalidVariant. ``prefix`` is the
+    requesting tenant's bucket prefix (the caller checks it owns ``key``)."""
+    variant = Variant(key, w, h, fit or DEFAULT_FIT, fmt or DEFAULT_FORMAT, prefix)
+    if variant.fit not in FITS:
+        raise InvalidVariant(f"fit must be one of: {', '.join(FITS)}")
+    if variant.fmt not in FORMATS:
+        raise InvalidVariant(f"fmt must be one of: {', '.join(FORMATS)}")
+    for d in (w, h):
+        if d is not None and not 1 <= d <= settings.IMAGE_MAX_DIMENSION:
+            raise InvalidVariant(f"w and h must be between 1 and {settings.IMAGE_MAX_DIMENSION}")
+    if sig is not None:
+        if not hmac.compare_digest(sig, sign(variant)):
+            raise InvalidVariant("Invalid signature")
+    elif not _whitelisted(variant):
+        raise InvalidVariant("Size not allowed without a signature")
+    return variant
+
+
+def image_url(
+    key: str, w: int | None = None, h: int | None = None,
+    fit: str = DEFAULT_FIT, fmt: str = DEFAULT_FORMAT,
+) -> str:
+    """URL of a variant; signed if its size isn't one of IMAGE_WIDTHS."""
+    variant = Variant(key, w, h, fit, fmt)
+    params = {"w": w, "h": h}
+    if fit != DEFAULT_FIT:
+        params["fit"] = fit
+    if fmt != DEFAULT_FORMAT:
+        params["fmt"] = fmt
+    params = {k: v for k, v in params.items() if v is not None}
+    if not _whitelisted(variant):
+        params["s"] = sign(variant)
+    query = urlencode(params)
+    return f"/img/{quote(key)}" + (f"?{query}" if query else "")
+
+
+def transformable(key: str | None) -> bool:
+    return bool(
+        settings.IMAGE_TRANSFORM_ENABLED and key
+        and not key.startswith("http") and not is_private_key(key)
+    )
+
+
+def srcset(key: str | None) -> str:
+    """``srcset`` of IMAGE_WIDTHS variants of ``key`` ("" if not transformable)."""
+    if not transformable(key):
+        return ""
+    return ", ".join(f"{image_url(key, w)} {w}w" for w in settings.image_widths)
+
+
+def grid_sizes(span_class: str, tall: bool = False) -> str:
+    """``sizes`` of a grid cover, mirroring the grid breakpoints in main.css
+    (12 columns on desktop, 6 on tablets, 1 on phones). Tall cells are twice
+    as high, so a landscape cover needs twice the width to fill them."""
+    try:
+        span = int(span_class.removeprefix("span-"))
+    except ValueError:
+        span = 4
+    scale = 2 if tall else 1
+    tablet = (50 if span >= 4 else 34) * scale
+    desktop = round(span / 12 * 100) * scale
+    return f"(max-width: 640px) 100vw, (max-width: 1024px) {tablet}vw, {desktop}vw"
+
+
+# ── Transform pool ─────────────────────────────────────────
+
+@lru_cache
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn: forking a worker with running threads (S3 pool, DB) isn't safe
+    return ProcessPoolExecutor(
+        max_workers=settings.IMAGE_TRANSFORM_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_pool() -> None:
+    if _get_pool.cache_info().currsize:
+        _get_pool().shutdown(cancel_futures=True)
+
+
+async def _transform(variant: Variant) -> bytes:
+    """Resize the source in the pool. Raises ClientError (missing source),
+    ObjectTooLarge and imaging.TransformError."""
+    loop = asyncio.get_running_loop()
+
+    async def run(path: Path) -> bytes:
+        return await loop.run_in_executor(
+            _get_pool(), transform,
+            str(path), variant.w, variant.h, variant.fit, variant.fmt, settings.IMAGE_QUALITY,
+        )
+
+    try:
+        return await run(await media_cache.get_path(variant.key))
+    except FileNotFoundError:  # evicted by another worker meanwhile: fetch it again
+        return await run(await media_cache.get_path(variant.key))
+
+
+# ── Tiers ──────────────────────────────────────────────────
+
+async def _store(variant: Variant, data: bytes) -> None:
+    try:
+        await aupload_file_to_s3(data, "", variant.media_type, key=variant.storage_key)
+    except Exception as exc:
+        print(f"✗ Storing image variant {variant.storage_key} failed: {exc!r}")
+
+
+async def _load(variant: Variant) -> Path:
+    from botocore.exceptions import ClientError
+
+    try:
+        return await media_cache.get_path(variant.storage_key)  # disk, then bucket
+    except ClientError as exc:
+        if not is_not_found(exc):
+            raise
+
+    data = await _transform(variant)
+    _, path = await asyncio.gather(_store(variant, data), media_cache.put(variant.storage_key, data))
+    return path
+
+
+async def get_variant(variant: Variant) -> Path:
+    """Local file of the variant, in the media disk cache.
+
+    Raises ClientError if the source doesn't exist, ObjectTooLarge if it is
+    above MEDIA_CACHE_MAX_OBJECT_BYTES and TransformError if it isn't an image.
+    """
+    return await single_flight(f"img:{variant.storage_key}", partial(_load, variant))
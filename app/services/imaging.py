@@ -0,0 +1,74 @@
+"""Image resizing, run in worker processes by ``image_variants``.
+
+Kept free of app imports: the process pool imports this module in each child,
+and Pillow is only loaded there.
+"""
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+FITS = ("contain", "cover")
+ORIENTATION = 0x0112  # EXIF tag
+
+
+class TransformError(ValueError):
+    """The source could not be decoded as an image (or is too large to)."""
+
+
+def _cover_size(src: tuple[int, int], w: int, h: int) -> tuple[int, int]:
+    """Target of a ``cover`` crop: w x h, shrunk to the source's resolution if
+    that is smaller, so the crop keeps the aspect ratio but never upscales."""
+    scale = min(src[0] / w, src[1] / h, 1)
+    return max(round(w * scale), 1), max(round(h * scale), 1)
+
+
+def _draft(img, w: int | None, h: int | None, fit: str) -> None:
+    """Let JPEGs decode at a reduced scale that still covers the output size."""
+    width, height = img.size
+    if img.getexif().get(ORIENTATION) in (5, 6, 7, 8):  # stored rotated by 90°
+        w, h = h, w
+    scales = [s for s in (w and w / width, h and h / height) if s]
+    if not scales:
+        return
+    scale = max(scales) if fit == "cover" else min(scales)
+    if scale < 1:
+        img.draft("RGB", (max(round(width * scale), 1), max(round(height * scale), 1)))
+
+
+def transform(path: str, w: int | None, h: int | None, fit: str, fmt: str, quality: int) -> bytes:
+    """Resize the image at ``path`` and encode it as ``fmt``.
+
+    ``contain`` fits the image inside w x h (either may be None), ``cover``
+    fills w x h and crops the overflow (centered). Images are never upscaled,
+    EXIF orientation is applied and metadata is dropped.
+    """
+    import io
+
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(path) as img:
+            cover = fit == "cover" and w and h
+            _draft(img, w, h, "cover" if cover else "contain")
+            img = ImageOps.exif_transpose(img)
+            if cover:
+                img = ImageOps.fit(img, _cover_size(img.size, w, h), Image.Resampling.LANCZOS)
+            else:
+                img.thumbnail((w or img.width, h or img.height), Image.Resampling.LANCZOS)
+
+            if fmt == "jpeg" and img.mode != "RGB":
+                img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA" if "transparency" in img.info or img.mode.endswith("A") else "RGB")
+
+            out = io.BytesIO()
+            if fmt == "png":
+                img.save(out, "PNG", optimize=True)
+            elif fmt == "jpeg":
+                img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+            else:
+                img.save(out, "WEBP", quality=quality, method=4)
+            return out.getvalue()
+    except FileNotFoundError:
+        raise
+    except (OSError, Image.DecompressionBombError, SyntaxError) as exc:
+        # Pillow raises OSError subclasses for undecodable files; re-raised as
+        # a plain picklable error so it crosses the process boundary intact.
+        raise TransformError(f"{type(exc).__name__}: {exc}") from None
@@ -0,0 +1,153 @@
+"""Byte-bounded LRU disk cache for bucket objects served by the media proxy.
+
+Files are named by the SHA-256 of their key and written atomically (temp file
++ rename), so several workers can share one directory. Each worker keeps its
+own LRU index and evicts from it, so the byte bound applies per worker.
+Concurrent misses for the same key share a single download. Objects larger
+than ``max_object_bytes`` are never cached; callers get ObjectTooLarge and
+should stream them from the bucket instead.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.services.s3 import get_s3_client, run_s3
+
+settings = get_settings()
+
+DOWNLOAD_CHUNK = 1024 * 1024
+
+
+class ObjectTooLarge(Exception):
+    pass
+
+
+class MediaCache:
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.dir = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()  # name -> size, oldest first
+        self._total = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._too_large: set[str] = set()
+        self._loading: asyncio.Task | None = None
+
+    def _load(self) -> None:
+        """Adopt files left by a previous process, least recently used first."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.dir.iterdir():
+            if path.suffix == ".part":
+                path.unlink(missing_ok=True)
+            elif path.is_file():
+                st = path.stat()
+                files.append((st.st_atime, path.name, st.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+        self._evict()
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            (self.dir / name).unlink(missing_ok=True)
+
+    def _add(self, name: str, size: int) -> None:
+        if name in self._entries:
+            self._total -= self._entries.pop(name)
+        self._entries[name] = size
+        self._total += size
+        self._evict()
+
+    def _download(self, key: str, path: Path) -> int:
+        obj = get_s3_client().get_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        body = obj["Body"]
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            if obj["ContentLength"] > self.max_object_bytes:
+                raise ObjectTooLarge(key)
+            with open(tmp, "wb") as f:
+                while chunk := body.read(DOWNLOAD_CHUNK):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            body.close()
+            tmp.unlink(missing_ok=True)
+        return path.stat().st_size
+
+    async def _fill(self, key: str, name: str) -> Path:
+        path = self.dir / name
+        try:
+            size = await run_s3(self._download, key, path)
+        except ObjectTooLarge:
+            if len(self._too_large) > 10_000:
+                self._too_large.clear()
+            self._too_large.add(name)
+            raise
+        self._add(name, size)
+        return path
+
+    async def _ready(self) -> None:
+        if self._loading is None:
+            self._loading = asyncio.create_task(asyncio.to_thread(self._load))
+        await asyncio.shield(self._loading)
+
+    async def get_path(self, key: str) -> Path:
+        """Local path of the object, downloading it on a miss.
+
+        Raises ObjectTooLarge for objects that must not be cached.
+        """
+        await self._ready()
+        name = self._name(key)
+        path = self.dir / name
+
+        if name in self._too_large:
+            raise ObjectTooLarge(key)
+        if name in self._entries and path.exists():
+            self._entries.move_to_end(name)
+            return path
+        if name not in self._entries and path.exists():  # fetched by another worker
+            self._add(name, path.stat().st_size)
+            return path
+
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def put(self, key: str, data: bytes) -> Path:
+        """Cache ``data`` as the object ``key`` (e.g. one this worker just
+        uploaded), so the next ``get_path`` doesn't download it."""
+        await self._ready()
+        name = self._name(key)
+        path = self.dir / name
+        await asyncio.to_thread(self._write, path, data)
+        self._add(name, len(data))
+        return path
+
+
+media_cache = MediaCache(
+    settings.MEDIA_CACHE_DIR,
+    settings.MEDIA_CACHE_MAX_BYTES,
+    settings.MEDIA_CACHE_MAX_OBJECT_BYTES,
+)
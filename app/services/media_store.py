@@ -0,0 +1,95 @@
+"""Content-addressed media uploads.
+
+Uploads are hashed (SHA-256) while they are read and stored at
+``<tenant prefix>[<private prefix>]media/<sha256><ext>``. Before anything is
+sent to the bucket the hashes are looked up in ``media_objects``, an index of
+known content per tenant and scope (public, or the MEDIA_PRIVATE_PREFIXES
+entry the upload folder falls under). Content that is already stored reuses
+its key: one object and one cacheable URL, however many times the same image
+is uploaded. Index rows are only written after the bucket write succeeded.
+Lookups and inserts use short sessions of their own, so no pooled connection
+is held while bytes go to the bucket.
+"""
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.models.media import MediaObject
+from app.schemas.tenant import TenantInfo
+from app.services.s3 import aupload_many, file_extension
+
+settings = get_settings()
+
+MEDIA_FOLDER = "media/"
+
+
+def upload_scope(folder: str) -> str:
+    """The private prefix a tenant-relative folder falls under, "" if public."""
+    return next((p for p in settings.private_media_prefixes if folder.startswith(p)), "")
+
+
+def content_key(tenant: TenantInfo, scope: str, digest: str, filename: str) -> str:
+    return f"{tenant.bucket_prefix}{scope}{MEDIA_FOLDER}{digest}{file_extension(filename)}"
+
+
+async def _known_keys(tenant_id: int, scope: str, digests: set[str]) -> dict[str, str]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(MediaObject.sha256, MediaObject.key).where(
+                MediaObject.tenant_id == tenant_id,
+                MediaObject.scope == scope,
+                MediaObject.sha256.in_(digests),
+            )
+        )
+        return dict(result.all())
+
+
+async def store_uploads(tenant: TenantInfo, folder: str, files: list[dict]) -> list[dict]:
+    """Store uploads under content-addressed keys, skipping known content.
+
+    ``folder`` is tenant-relative and only decides the scope. Each file is
+    ``{file_data, size, filename, content_type, sha256}``. Returns one result per
+    file, in order: ``{ok, key, public_url, deduplicated}`` or
+    ``{ok: false, error}``.
+    """
+    scope = upload_scope(folder)
+    known = await _known_keys(tenant.id, scope, {f["sha256"] for f in files})
+
+    pending: dict[str, dict] = {}  # sha256 -> upload kwargs; repeats in the batch upload once
+    sizes = {f["sha256"]: f["size"] for f in files}
+    for f in files:
+        if f["sha256"] not in known and f["sha256"] not in pending:
+            pending[f["sha256"]] = {
+                "file_data": f["file_data"],
+                "filename": f["filename"],
+                "content_type": f["content_type"],
+                "key": content_key(tenant, scope, f["sha256"], f["filename"]),
+            }
+    uploaded = dict(zip(pending, await aupload_many(list(pending.values()))))
+
+    rows = [
+        {
+            "tenant_id": tenant.id, "scope": scope, "sha256": digest, "key": result["key"],
+            "size": sizes[digest],
+            "content_type": pending[digest]["content_type"],
+        }
+        for digest, result in uploaded.items() if result["ok"]
+    ]
+    if rows:
+        # A concurrent upload of the same content may have won; its key stays
+        # canonical and ours remains a valid (identical) object.
+        async with async_session_factory() as session:
+            await session.execute(pg_insert(MediaObject).on_conflict_do_nothing(), rows)
+            await session.commit()
+
+    results, seen = [], set(known)
+    for f in files:
+        digest = f["sha256"]
+        if digest in known:
+            key = known[digest]
+            results.append({"ok": True, "key": key, "public_url": key, "deduplicated": True})
+        else:
+            results.append({**uploaded[digest], "deduplicated": digest in seen})
+        seen.add(digest)
+    return results
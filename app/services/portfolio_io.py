@@ -0,0 +1,163 @@
+"""NDJSON export/import of one tenant's portfolio (works + site settings).
+
+One JSON object per line: ``{"type": "work" | "site_settings", "data": {...}}``.
+A work's gallery is exported as ``media`` (key, kind, dimensions, size, in
+order); imports also accept the older ``gallery_urls`` list of keys.
+Export streams rows from a server-side cursor; import upserts in fixed-size
+chunks with ``INSERT ... ON CONFLICT DO UPDATE``, so memory use does not depend
+on catalog size.
+"""
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.settings import SiteSettings
+from app.models.work import MEDIA_POSITION_STEP, Work, WorkMedia, media_kind
+from app.schemas.settings import SiteSettingsUpdate
+from app.schemas.work import WorkCreate, WorkMediaCreate
+
+CHUNK_SIZE = 1000
+
+WORK_FIELDS = (
+    "slug", "title", "description", "year", "tags", "cover_url",
+    "span_class", "is_tall", "sort_order",
+)
+MEDIA_FIELDS = ("key", "kind", "width", "height", "size")
+SETTINGS_FIELDS = tuple(SiteSettingsUpdate.model_fields)
+
+
+def _line(record_type: str, data: dict) -> str:
+    return json.dumps({"type": record_type, "data": data}, ensure_ascii=False) + "\n"
+
+
+async def export_ndjson(db: AsyncSession, tenant_id: int) -> AsyncIterator[str]:
+    """Yield the tenant's portfolio as NDJSON, one chunk of lines at a time."""
+    result = await db.execute(select(SiteSettings).where(SiteSettings.tenant_id == tenant_id))
+    site = result.scalar_one_or_none()
+    if site:
+        yield _line("site_settings", {f: getattr(site, f) for f in SETTINGS_FIELDS})
+
+    columns = [Work.__table__.c[f] for f in WORK_FIELDS]
+    item = func.json_build_object(*(x for f in MEDIA_FIELDS for x in (f, getattr(WorkMedia, f))))
+    media = (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(item, WorkMedia.position)), func.json_build_array(), type_=JSON,
+        ))
+        .where(WorkMedia.work_id == Work.id)
+        .scalar_subquery()
+        .label("media")
+    )
+    stmt = (
+        select(*columns, media)
+        .where(Work.tenant_id == tenant_id)
+        .order_by(Work.sort_order, Work.created_at)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        yield "".join(_line("work", dict(row._mapping)) for row in rows)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split an async byte stream (e.g. ``request.stream()``) into text lines."""
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if buf:
+        yield buf.decode("utf-8")
+
+
+async def _upsert_works(db: AsyncSession, rows: list[dict], media: dict[str, list[dict]]) -> None:
+    """Upsert works by slug, then replace the galleries of those works."""
+    stmt = pg_insert(Work.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Work.__table__.c.tenant_id, Work.__table__.c.slug],
+        set_={
+            **{f: stmt.excluded[f] for f in WORK_FIELDS if f != "slug"},
+            "updated_at": func.now(),
+        },
+    ).returning(Work.__table__.c.slug, Work.__table__.c.id)
+    ids = dict((await db.execute(stmt, rows)).all())
+
+    await db.execute(delete(WorkMedia.__table__).where(WorkMedia.__table__.c.work_id.in_(ids.values())))
+    media_rows = [
+        {**item, "work_id": ids[slug], "position": i * MEDIA_POSITION_STEP}
+        for slug, items in media.items()
+        for i, item in enumerate(items, start=1)
+    ]
+    if media_rows:
+        await db.execute(insert(WorkMedia.__table__), media_rows)
+
+
+def _media_rows(data: dict, gallery_urls: list[str]) -> list[dict]:
+    if "media" not in data:  # older exports: keys only
+        return [{"key": key, "kind": media_kind(key)} | dict.fromkeys(MEDIA_FIELDS[2:]) for key in gallery_urls]
+    rows = []
+    for raw in data["media"]:
+        item = WorkMediaCreate.model_validate(raw)
+        rows.append({**item.model_dump(include=set(MEDIA_FIELDS)), "kind": item.kind or media_kind(item.key)})
+    return rows
+
+
+async def _upsert_site_settings(db: AsyncSession, tenant_id: int, data: dict) -> None:
+    stmt = pg_insert(SiteSettings.__table__).values(tenant_id=tenant_id, **data)
+    conflict = [SiteSettings.__table__.c.tenant_id]
+    if data:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict,
+            set_={**data, "updated_at": func.now()},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict)
+    await db.execute(stmt)
+
+
+async def import_ndjson(
+    db: AsyncSession, tenant_id: int, lines: AsyncIterable[str], chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """Upsert the tenant's works (by slug) and site settings from NDJSON lines.
+
+    Raises ValueError on a malformed line; the caller owns the transaction,
+    so a failed import leaves the database untouched.
+    """
+    counts = {"works": 0, "site_settings": 0}
+    batch: dict[str, dict] = {}  # keyed by slug: ON CONFLICT can't hit a row twice
+    media: dict[str, list[dict]] = {}
+
+    lineno = 0
+    async for raw in lines:
+        lineno += 1
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+            record_type, data = record["type"], record["data"]
+            if record_type == "work":
+                work = WorkCreate.model_validate(data)
+                batch[work.slug] = {**work.model_dump(include=set(WORK_FIELDS)), "tenant_id": tenant_id}
+                media[work.slug] = _media_rows(data, work.gallery_urls)
+            elif record_type == "site_settings":
+                site = SiteSettingsUpdate.model_validate(data).model_dump(exclude_unset=True)
+                await _upsert_site_settings(db, tenant_id, site)
+                counts["site_settings"] += 1
+            else:
+                raise ValueError(f"unknown record type {record_type!r}")
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"line {lineno}: {exc}") from exc
+
+        if len(batch) >= chunk_size:
+            await _upsert_works(db, list(batch.values()), media)
+            counts["works"] += len(batch)
+            batch.clear()
+            media.clear()
+
+    if batch:
+        await _upsert_works(db, list(batch.values()), media)
+        counts["works"] += len(batch)
+    return counts
@@ -0,0 +1,138 @@
+"""Cache pre-warming: request a tenant's public pages before real users do.
+
+Walks the sitemap — ``/``, every ``/work/{slug}`` and ``/api/works``
+(unfiltered and per tag) — with bounded concurrency and reports each URL's
+status and time. In-process (against the ASGI app) it warms this worker: DB
+pool, templates, presigned URLs, fragment and related-works caches. Over HTTP
+it also warms the CDN and whichever workers answer. Requests carry the
+prewarm token, which exempts them from per-IP rate limits; admission control
+still applies, so PREWARM_CONCURRENCY should stay below its public/API limits.
+"""
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.limiter import PREWARM_HEADER, prewarm_token
+from app.core.tenancy import list_active_tenants
+from app.models.tenant import DEFAULT_TENANT_ID
+from app.models.work import Work
+from app.schemas.tenant import TenantInfo
+
+settings = get_settings()
+
+ASGI_BASE_URL = "http://prewarm.internal"
+
+
+def tenant_host(tenant: TenantInfo) -> str | None:
+    """Host header that resolves to the tenant (None: any host does)."""
+    if not settings.MULTI_TENANT:
+        return None
+    if tenant.host:
+        return tenant.host
+    if settings.TENANT_BASE_DOMAIN:
+        return f"{tenant.slug}.{settings.TENANT_BASE_DOMAIN}"
+    return None
+
+
+async def served_tenants() -> list[TenantInfo]:
+    """Active tenants this deployment serves (only the default one with MULTI_TENANT off)."""
+    tenants = await list_active_tenants()
+    if not settings.MULTI_TENANT:
+        tenants = [t for t in tenants if t.id == DEFAULT_TENANT_ID]
+    return tenants
+
+
+async def sitemap_paths(tenant_id: int) -> list[str]:
+    """Public URLs worth warming, homepage first."""
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(Work.slug)
+            .where(Work.tenant_id == tenant_id)
+            .order_by(Work.sort_order, Work.created_at.desc())
+        )
+        slugs = result.scalars().all()
+        tag = func.unnest(Work.tags).label("tag")
+        result = await session.execute(
+            select(tag).where(Work.tenant_id == tenant_id).distinct().order_by(tag)
+        )
+        tags = result.scalars().all()
+    return [
+        "/",
+        *(f"/work/{slug}" for slug in slugs),
+        "/api/works",
+        *(str(httpx.URL("/api/works", params={"tag": t})) for t in tags),
+    ]
+
+
+def make_client(app=None, base_url: str | None = None) -> httpx.AsyncClient:
+    """Client for ``prewarm``: in-process against ``app``, or over HTTP to ``base_url``."""
+    transport = httpx.ASGITransport(app=app) if app is not None else None
+    return httpx.AsyncClient(
+        transport=transport,
+        base_url=base_url or ASGI_BASE_URL,
+        headers={PREWARM_HEADER: prewarm_token()},
+        timeout=settings.PREWARM_TIMEOUT,
+        follow_redirects=False,
+    )
+
+
+async def prewarm(
+    client: httpx.AsyncClient, paths: list[str],
+    host: str | None = None, concurrency: int | None = None,
+) -> dict:
+    """GET every path; returns ``{urls: [{path, status, ms}], total_ms, failed}``.
+
+    ``status`` is None when the request itself failed (timeout, connection).
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.PREWARM_CONCURRENCY)
+    headers = {"host": host} if host else {}
+
+    async def one(path: str) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            ms = round((time.perf_counter() - started) * 1000, 1)
+            return {"path": path, "status": status, "ms": ms}
+
+    started = time.perf_counter()
+    urls = await asyncio.gather(*(one(p) for p in paths))
+    return {
+        "urls": urls,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "failed": sum(1 for u in urls if u["status"] is None or u["status"] >= 400),
+    }
+
+
+async def prewarm_tenant(
+    client: httpx.AsyncClient, tenant: TenantInfo,
+    host: str | None = None, concurrency: int | None = None,
+) -> dict:
+    """Prewarm one tenant's sitemap. Raises ValueError if no Host header can
+    reach the tenant (multi-tenant, no custom domain, no TENANT_BASE_DOMAIN)."""
+    if not settings.MULTI_TENANT and tenant.id != DEFAULT_TENANT_ID:
+        raise ValueError(f"tenant {tenant.slug!r} is not served with MULTI_TENANT off")
+    host = host or tenant_host(tenant)
+    if settings.MULTI_TENANT and not host:
+        raise ValueError(f"tenant {tenant.slug!r} has no host to prewarm")
+    paths = await sitemap_paths(tenant.id)
+    return await prewarm(client, paths, host, concurrency)
+
+
+def summary_line(tenant: TenantInfo, report: dict) -> str:
+    urls = report["urls"]
+    slowest = max(urls, key=lambda u: u["ms"]) if urls else None
+    line = (
+        f"Prewarm ({tenant.slug}): {len(urls)} URLs in {report['total_ms']:.0f}ms, "
+        f"{report['failed']} failed"
+    )
+    if slowest:
+        line += f", slowest {slowest['path']} {slowest['ms']:.0f}ms"
+    return ("✗ " if report["failed"] else "✓ ") + line
@@ -0,0 +1,184 @@
+"""Pre-render a tenant's public site to static HTML and sync it to the bucket.
+
+Renders the homepage, every work page and the 404 page with fingerprinted
+static assets, then uploads only the files whose content hash differs from
+the manifest of the previous publish (stored next to the site in the bucket).
+Files that disappeared (deleted works) are removed. Each tenant's site lives
+under ``<bucket_prefix><STATIC_SITE_PREFIX>``.
+
+Media links must be plain CDN_BASE_URL URLs: presigned or /media URLs would
+expire or break off-app, and re-signing would change every page each publish.
+"""
+import asyncio
+import hashlib
+import json
+
+from fastapi import BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.templates import STATIC_DIR, static_hash, templates
+from app.models.work import Work
+from app.schemas.tenant import TenantInfo
+from app.services.related import RelatedIndex, related_entry
+from app.services.s3 import get_cdn_url, get_s3_client, run_s3
+from app.services.settings import get_site_settings
+
+settings = get_settings()
+
+STATIC_ASSETS = ("css/main.css", "js/portfolio.js")
+MANIFEST_NAME = "_manifest.json"
+
+HTML_CACHE = "public, max-age=60, must-revalidate"
+ASSET_CACHE = "public, max-age=31536000, immutable"
+
+_publish_lock = asyncio.Lock()
+_publish_pending: set[TenantInfo] = set()
+
+
+class PublishError(RuntimeError):
+    """The site can't be published as static files (see the message)."""
+
+
+def _fingerprinted(path: str) -> str:
+    stem, ext = path.rsplit(".", 1)
+    return f"static/{stem}.{static_hash(path)}.{ext}"
+
+
+def _media_url(key: str) -> str:
+    """Stable CDN URL of ``key``; raises PublishError if it has none."""
+    url = get_cdn_url(key)
+    if url is None:
+        raise PublishError(f"Private media can't be published: {key}")
+    return url
+
+
+def _render_env():
+    # overlay() shares globals/filters dicts and the template cache with the
+    # app environment; give it its own so the overrides don't leak back.
+    env = templates.env.overlay(cache_size=50)
+    env.globals = {**env.globals, "static_url": lambda path: "/" + _fingerprinted(path)}
+    # /img variants are served by the app, not the bucket site: plain src only
+    env.filters = {**env.filters, "s3url": _media_url, "srcset": lambda key: ""}
+    return env
+
+
+def site_prefix(tenant: TenantInfo) -> str:
+    return f"{tenant.bucket_prefix}{settings.STATIC_SITE_PREFIX}"
+
+
+async def render_site(db: AsyncSession, tenant: TenantInfo) -> dict[str, tuple[bytes, str, str]]:
+    """Return ``{object_key: (body, content_type, cache_control)}`` for the tenant's site.
+
+    Raises PublishError if CDN_BASE_URL isn't set.
+    """
+    if not settings.CDN_BASE_URL:
+        raise PublishError("Static publishing needs CDN_BASE_URL for media links")
+    site = await get_site_settings(db, tenant.id)
+    result = await db.execute(
+        select(Work)
+        .where(Work.tenant_id == tenant.id)
+        .order_by(Work.sort_order, Work.created_at.desc())
+        .options(selectinload(Work.media))
+    )
+    works = result.scalars().all()
+    # Rendering is CPU-bound (every page of the site): keep it off the event loop
+    return await asyncio.to_thread(_render_files, site, works)
+
+
+def _render_files(site, works) -> dict[str, tuple[bytes, str, str]]:
+    env = _render_env()
+
+    def html(template: str, **ctx) -> tuple[bytes, str, str]:
+        body = env.get_template(template).render(request=None, site=site, **ctx)
+        return body.encode("utf-8"), "text/html; charset=utf-8", HTML_CACHE
+
+    files = {
+        "index.html": html("public/index.html", works=works),
+        "404.html": html("public/404.html"),
+    }
+    related = RelatedIndex([related_entry(w) for w in works], settings.RELATED_WORKS_COUNT)
+    for work in works:
+        files[f"work/{work.slug}"] = html(
+            "public/work_detail.html", work=work, related=related.related(work.slug),
+        )
+
+    for path in STATIC_ASSETS:
+        content_type = "text/css" if path.endswith(".css") else "application/javascript"
+        files[_fingerprinted(path)] = ((STATIC_DIR / path).read_bytes(), content_type, ASSET_CACHE)
+    return files
+
+
+def _sync_to_bucket(files: dict[str, tuple[bytes, str, str]], prefix: str) -> dict:
+    client = get_s3_client()
+    manifest_key = f"{prefix}{MANIFEST_NAME}"
+
+    try:
+        obj = client.get_object(Bucket=settings.S3_BUCKET_NAME, Key=manifest_key)
+        previous = json.loads(obj["Body"].read())
+    except client.exceptions.NoSuchKey:
+        previous = {}
+
+    current = {key: hashlib.sha256(body).hexdigest() for key, (body, _, _) in files.items()}
+    uploaded = [key for key in current if previous.get(key) != current[key]]
+    deleted = [key for key in previous if key not in current]
+
+    for key in uploaded:
+        body, content_type, cache_control = files[key]
+        client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=f"{prefix}{key}",
+            Body=body,
+            ContentType=content_type,
+            CacheControl=cache_control,
+        )
+    for key in deleted:
+        client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=f"{prefix}{key}")
+
+    if uploaded or deleted:
+        client.put_object(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=manifest_key,
+            Body=json.dumps(current).encode("utf-8"),
+            ContentType="application/json",
+            CacheControl="no-store",
+        )
+    return {"uploaded": uploaded, "deleted": deleted, "unchanged": len(current) - len(uploaded)}
+
+
+async def publish_site(db: AsyncSession, tenant: TenantInfo) -> dict:
+    """Render the tenant's site and upload whatever changed since the last publish."""
+    files = await render_site(db, tenant)
+    return await run_s3(_sync_to_bucket, files, site_prefix(tenant))
+
+
+def schedule_publish(background_tasks: BackgroundTasks, tenant: TenantInfo) -> None:
+    """Queue an incremental publish after the response, if auto-publish is on."""
+    if settings.STATIC_SITE_AUTO_PUBLISH:
+        background_tasks.add_task(publish_in_background, tenant)
+
+
+async def publish_in_background(tenant: TenantInfo) -> None:
+    """Background-task entry point: serialises publishes and coalesces bursts.
+
+    Admin writes that arrive while a publish is running trigger exactly one
+    follow-up publish per tenant instead of one each.
+    """
+    _publish_pending.add(tenant)
+    if _publish_lock.locked():
+        return
+    async with _publish_lock:
+        while _publish_pending:
+            tenant = _publish_pending.pop()
+            try:
+                async with async_session_factory() as session:
+                    summary = await publish_site(session, tenant)
+                print(
+                    f"✓ Static publish ({tenant.slug}): {len(summary['uploaded'])} uploaded, "
+                    f"{len(summary['deleted'])} deleted, {summary['unchanged']} unchanged"
+                )
+            except Exception as exc:
+                print(f"✗ Static publish failed ({tenant.slug}): {exc!r}")
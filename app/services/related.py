@@ -0,0 +1,232 @@
+"""In-memory "related works" index, one per tenant and worker.
+
+Keeps an inverted index tag -> work ids and the precomputed top
+RELATED_WORKS_COUNT related works of every work, ranked by tag Jaccard
+similarity, then by closeness in year, then by sort_order. Detail pages and
+the works API read it without touching the database.
+
+The index is built from one query the first time a tenant needs it and
+rebuilt in the background once it is older than RELATED_INDEX_TTL (that is
+how writes handled by other workers arrive). Admin writes in this worker
+update it incrementally: only works sharing a tag with a changed work are
+re-ranked, on the event loop. A write that would re-rank more than
+RELATED_MAX_RERANK works (a tag most works share) triggers a background
+rebuild in a thread instead; the unchanged index serves until it is ready.
+"""
+import asyncio
+import heapq
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.models.work import Work
+
+settings = get_settings()
+
+FIELDS = ("slug", "title", "cover_url", "year", "sort_order", "tags")
+RANKING_FIELDS = {"tags", "year", "sort_order"}
+NO_YEAR_GAP = 10_000  # works without a year rank after any dated match
+
+
+def related_entry(work: Work) -> dict:
+    """Index entry for a work, snapshotted so it can be applied after commit."""
+    return {"id": work.id, **{f: getattr(work, f) for f in FIELDS}}
+
+
+class RelatedIndex:
+    def __init__(self, entries: list[dict], top_k: int):
+        self.top_k = top_k
+        self.built_at = time.monotonic()
+        self.works: dict[uuid.UUID, dict] = {}
+        self.by_slug: dict[str, uuid.UUID] = {}
+        self.by_tag: dict[str, set[uuid.UUID]] = {}
+        self.related_ids: dict[uuid.UUID, list[uuid.UUID]] = {}
+        for entry in entries:
+            self._insert(entry)
+        for work_id in self.works:
+            self._rank(work_id)
+
+    def _insert(self, entry: dict) -> None:
+        entry = {**entry, "tags": frozenset(entry["tags"] or ())}
+        self.works[entry["id"]] = entry
+        self.by_slug[entry["slug"]] = entry["id"]
+        for tag in entry["tags"]:
+            self.by_tag.setdefault(tag, set()).add(entry["id"])
+
+    def _drop(self, work_id: uuid.UUID) -> dict | None:
+        entry = self.works.pop(work_id, None)
+        if entry is None:
+            return None
+        if self.by_slug.get(entry["slug"]) == work_id:
+            del self.by_slug[entry["slug"]]
+        for tag in entry["tags"]:
+            members = self.by_tag.get(tag)
+            if members is not None:
+                members.discard(work_id)
+                if not members:
+                    del self.by_tag[tag]
+        self.related_ids.pop(work_id, None)
+        return entry
+
+    def _rank(self, work_id: uuid.UUID) -> None:
+        work = self.works[work_id]
+        tags = work["tags"]
+        shared = Counter(other for tag in tags for other in self.by_tag[tag])
+        shared.pop(work_id, None)
+
+        def key(other_id):
+            other = self.works[other_id]
+            overlap = shared[other_id]
+            jaccard = overlap / (len(tags) + len(other["tags"]) - overlap)
+            if work["year"] is None or other["year"] is None:
+                year_gap = NO_YEAR_GAP
+            else:
+                year_gap = abs(work["year"] - other["year"])
+            return (-jaccard, year_gap, other["sort_order"], other["slug"])
+
+        self.related_ids[work_id] = heapq.nsmallest(self.top_k, shared, key=key)
+
+    def _neighbours(self, entries) -> set[uuid.UUID]:
+        return {
+            other for entry in entries for tag in entry["tags"] for other in self.by_tag.get(tag, ())
+        }
+
+    def _rerank_bound(self, changes: list[dict], deleted: list[uuid.UUID]) -> int:
+        """Upper bound of the works ``apply`` would re-rank."""
+        bound = 0
+        for entry in [self.works[i] for i in deleted if i in self.works]:
+            bound += sum(len(self.by_tag.get(t, ())) for t in entry["tags"])
+        for change in changes:
+            if "tags" in change:
+                change = {**change, "tags": frozenset(change["tags"] or ())}
+            old = self.works.get(change["id"])
+            if old is not None and all(change[f] == old[f] for f in RANKING_FIELDS & change.keys()):
+                continue  # rankings stand
+            tags = change.get("tags", frozenset()) | (old["tags"] if old else frozenset())
+            bound += 1 + sum(len(self.by_tag.get(t, ())) for t in tags)
+        return bound
+
+    def apply(self, changes: list[dict], deleted: list[uuid.UUID]) -> bool:
+        """Apply (partial) entries and deletions; False if the index must be
+        rebuilt instead: an unknown work with a partial entry, or more than
+        RELATED_MAX_RERANK works to re-rank. Checked first, so on False the
+        index is unchanged (still consistent, just stale)."""
+        for change in changes:
+            if change["id"] not in self.works and not all(f in change for f in FIELDS):
+                return False
+        if self._rerank_bound(changes, deleted) > settings.RELATED_MAX_RERANK:
+            return False
+
+        affected: set[uuid.UUID] = set()
+        for work_id in deleted:
+            old = self._drop(work_id)
+            if old is not None:
+                affected |= self._neighbours([old])
+
+        for change in changes:
+            if "tags" in change:
+                change = {**change, "tags": frozenset(change["tags"] or ())}
+            old = self.works.get(change["id"])
+            if old is not None and all(change[f] == old[f] for f in RANKING_FIELDS & change.keys()):
+                # Title / cover / slug only: rankings stand
+                self.by_slug.pop(old["slug"], None)
+                self.works[old["id"]] = new = {**old, **change}
+                self.by_slug[new["slug"]] = old["id"]
+                continue
+            if old is not None:
+                affected |= self._neighbours([old])
+                self._drop(old["id"])
+            self._insert({**(old or {}), **change})
+            affected.add(change["id"])
+            affected |= self._neighbours([self.works[change["id"]]])
+
+        for work_id in affected:
+            if work_id in self.works:
+                self._rank(work_id)
+        return True
+
+    def related(self, slug: str) -> list[dict]:
+        """Related works of ``slug``, best first: ``{slug, title, cover_url, year}``."""
+        work_id = self.by_slug.get(slug)
+        if work_id is None:
+            return []
+        return [
+            {f: self.works[i][f] for f in ("slug", "title", "cover_url", "year")}
+            for i in self.related_ids.get(work_id, ())
+        ]
+
+
+# ── Per-tenant indexes ──────────────────────────────────────
+
+_indexes: dict[int, RelatedIndex] = {}
+_builds: dict[int, asyncio.Task] = {}
+_dirty: set[int] = set()  # changed while a build was loading: build again
+
+
+async def _load_entries(tenant_id: int) -> list[dict]:
+    columns = [Work.id, *(getattr(Work, f) for f in FIELDS)]
+    async with async_session_factory() as session:
+        result = await session.execute(select(*columns).where(Work.tenant_id == tenant_id))
+        return [dict(row._mapping) for row in result]
+
+
+async def _build(tenant_id: int) -> RelatedIndex:
+    while True:
+        _dirty.discard(tenant_id)
+        entries = await _load_entries(tenant_id)
+        index = await asyncio.to_thread(RelatedIndex, entries, settings.RELATED_WORKS_COUNT)
+        if tenant_id not in _dirty:
+            break
+    _indexes[tenant_id] = index
+    return index
+
+
+def _start_build(tenant_id: int) -> asyncio.Task:
+    task = _builds.get(tenant_id)
+    if task is None:
+        task = asyncio.create_task(_build(tenant_id))
+        _builds[tenant_id] = task
+        task.add_done_callback(lambda _: _builds.pop(tenant_id, None))
+    return task
+
+
+async def get_related_index(tenant_id: int) -> RelatedIndex:
+    """The tenant's index, built on first use. A stale index keeps serving
+    while its replacement is built in the background."""
+    index = _indexes.get(tenant_id)
+    if index is None:
+        return await asyncio.shield(_start_build(tenant_id))
+    if time.monotonic() - index.built_at > settings.RELATED_INDEX_TTL:
+        _start_build(tenant_id)
+    return index
+
+
+async def related_works(tenant_id: int, slug: str) -> list[dict]:
+    return (await get_related_index(tenant_id)).related(slug)
+
+
+# ── Admin write hooks (run as background tasks, after commit) ─
+# Async so Starlette runs them on the event loop, never concurrently with
+# readers (plain functions would run in its thread pool).
+
+async def update_related(
+    tenant_id: int, changes: list[dict], deleted: list[uuid.UUID] = (),
+) -> None:
+    """Apply admin changes to the tenant's index, if this worker has one;
+    large or unabsorbable changes rebuild it in the background instead."""
+    if tenant_id in _builds:
+        _dirty.add(tenant_id)
+    index = _indexes.get(tenant_id)
+    if index is not None and not index.apply(changes, list(deleted)):
+        _start_build(tenant_id)
+
+
+async def invalidate_related(tenant_id: int) -> None:
+    """Drop the tenant's index; the next reader rebuilds it (bulk imports)."""
+    if tenant_id in _builds:
+        _dirty.add(tenant_id)
+    _indexes.pop(tenant_id, None)
@@ -1,17 +1,37 @@
+import asyncio
+import time
 import uuid
-
-import boto3
-from botocore.config import Config
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import BinaryIO
 
 from app.core.config import get_settings
 
 settings = get_settings()
 
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+PRESIGN_MEMO_MAX_ENTRIES = 10_000
+
+# (key, expires) -> (signed at, url). Presigning is synchronous (Jinja filters
+# call it), so this is a plain per-worker LRU rather than the async app cache.
+_presigned: OrderedDict[tuple[str, int], tuple[float, str]] = OrderedDict()
+
+
+@lru_cache
+def get_s3_client():
+    """Shared boto3 client (thread-safe). boto3 is imported on first use to keep
+    it off the worker boot path."""
+    import boto3
+    from botocore.config import Config
 
-def _get_s3_client():
     kwargs = {
         "region_name": settings.S3_REGION or "auto",
-        "config": Config(signature_version="s3v4"),
+        "config": Config(
+            signature_version="s3v4",
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        ),
     }
     if settings.S3_ENDPOINT_URL:
         kwargs["endpoint_url"] = settings.S3_ENDPOINT_URL
@@ -23,26 +43,36 @@ def _get_s3_client():
     return boto3.client("s3", **kwargs)
 
 
+def file_extension(filename: str) -> str:
+    if "." in filename:
+        return "." + filename.rsplit(".", 1)[-1].lower()
+    return ""
+
+
 def upload_file_to_s3(
-    file_data: bytes,
+    file_data: bytes | BinaryIO,
     filename: str,
     content_type: str,
     folder: str = "works/",
+    key: str | None = None,
 ) -> dict:
-    """Upload file through the server to S3 bucket."""
-    ext = ""
-    if "." in filename:
-        ext = "." + filename.rsplit(".", 1)[-1].lower()
+    """Upload file through the server to S3 bucket.
 
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    key = f"{folder}{unique_name}"
+    Stored as ``key`` if given (content-addressed uploads), else under a
+    random name in ``folder``. ``file_data`` may be a seekable file (e.g. a
+    spooled upload), streamed to the bucket instead of read into memory.
+    """
+    if key is None:
+        key = f"{folder}{uuid.uuid4().hex}{file_extension(filename)}"
 
-    client = _get_s3_client()
+    client = get_s3_client()
     client.put_object(
         Bucket=settings.S3_BUCKET_NAME,
         Key=key,
         Body=file_data,
         ContentType=content_type,
+        # Keys are unique per upload and never overwritten
+        CacheControl=IMMUTABLE_CACHE_CONTROL,
     )
 
     # Store key as the URL — we'll resolve to presigned GET on render
@@ -50,17 +80,120 @@ def upload_file_to_s3(
 
 
 def get_presigned_read_url(key: str, expires: int = 3600) -> str:
-    """Generate a presigned GET URL for reading a private object."""
+    """Generate a presigned GET URL for reading a private object.
+
+    A URL is reused for PRESIGN_REUSE_SECONDS after signing: concurrent and
+    repeat renders of the same key share one signature (and one browser-cache
+    entry) instead of each signing their own.
+    """
     if not key or key.startswith("http"):
         return key  # already a full URL or empty
-    client = _get_s3_client()
-    return client.generate_presigned_url(
+    now = time.monotonic()
+    memo_key = (key, expires)
+    hit = _presigned.get(memo_key)
+    if hit and now - hit[0] < settings.PRESIGN_REUSE_SECONDS:
+        _presigned.move_to_end(memo_key)
+        return hit[1]
+
+    client = get_s3_client()
+    url = client.generate_presigned_url(
         "get_object",
         Params={"Bucket": settings.S3_BUCKET_NAME, "Key": key},
         ExpiresIn=expires,
     )
+    _presigned[memo_key] = (now, url)
+    _presigned.move_to_end(memo_key)
+    if len(_presigned) > PRESIGN_MEMO_MAX_ENTRIES:
+        _presigned.popitem(last=False)
+    return url
+
+
+def is_private_key(key: str) -> bool:
+    """Private prefixes apply inside a tenant's bucket prefix too."""
+    if key.startswith(settings.TENANT_BUCKET_ROOT):
+        key = key[len(settings.TENANT_BUCKET_ROOT):].partition("/")[2]
+    return key.startswith(settings.private_media_prefixes)
+
+
+def get_cdn_url(key: str) -> str | None:
+    """Plain (never-expiring) CDN URL for a public key, or None if not possible."""
+    if not key or key.startswith("http"):
+        return key
+    if not settings.CDN_BASE_URL or is_private_key(key):
+        return None
+    return f"{settings.CDN_BASE_URL.rstrip('/')}/{key}"
+
+
+def get_media_url(key: str, expires: int = 3600) -> str:
+    """Resolve a stored media key for clients according to MEDIA_URL_MODE."""
+    if settings.MEDIA_URL_MODE == "cdn":
+        url = get_cdn_url(key)
+        if url is not None:
+            return url
+    elif settings.MEDIA_URL_MODE == "proxy" and settings.MEDIA_PROXY_ENABLED:
+        if key and not key.startswith("http") and not is_private_key(key):
+            return f"/media/{key}"
+    return get_presigned_read_url(key, expires)
+
+
+def safe_s3url(key: str, expires: int = 3600) -> str:
+    """``get_media_url`` that never raises (the ``s3url`` Jinja2 filter)."""
+    try:
+        if not key:
+            return ""
+        return get_media_url(key, expires)
+    except Exception:
+        return key  # fallback to raw key
+
+
+def is_not_found(exc) -> bool:
+    """Whether a botocore ClientError means the object doesn't exist."""
+    return exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}
 
 
 def delete_s3_object(key: str) -> None:
-    client = _get_s3_client()
+    client = get_s3_client()
     client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+
+
+# ── Async facade ────────────────────────────────────────────
+# boto3 blocks, so async code runs it on a dedicated thread pool sized to the
+# client's HTTP connection pool: concurrent calls reuse pooled connections and
+# never queue behind (or starve) the default executor.
+
+@lru_cache
+def _get_s3_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.S3_MAX_POOL_CONNECTIONS, thread_name_prefix="s3",
+    )
+
+
+async def run_s3(fn, /, *args, **kwargs):
+    """Run a blocking S3 call (or helper) on the S3 thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_s3_executor(), partial(fn, *args, **kwargs))
+
+
+async def aupload_file_to_s3(
+    file_data: bytes | BinaryIO, filename: str, content_type: str, folder: str = "works/",
+    key: str | None = None,
+) -> dict:
+    return await run_s3(upload_file_to_s3, file_data, filename, content_type, folder, key)
+
+
+async def aupload_many(files: list[dict], concurrency: int | None = None) -> list[dict]:
+    """Upload several files concurrently; returns one result per input, in order.
+
+    Each item is ``upload_file_to_s3`` kwargs. Failures don't abort the batch:
+    the result is ``{"ok": False, "error": ...}`` for that file.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.S3_UPLOAD_CONCURRENCY)
+
+    async def one(item: dict) -> dict:
+        async with semaphore:
+            try:
+                return {"ok": True, **await aupload_file_to_s3(**item)}
+            except Exception as exc:
+                return {"ok": False, "error": str(exc)}
+
+    return await asyncio.gather(*(one(item) for item in files))
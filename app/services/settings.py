@@ -1,18 +1,73 @@
+from collections.abc import Callable
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import get_cache
+from app.core.config import get_settings
+from app.core.singleflight import single_flight
 from app.models.settings import SiteSettings
+from app.schemas.tenant import TenantInfo
+from app.services.cdn import site_tag
+
+config = get_settings()
+
+
+def _default_site_settings() -> SiteSettings:
+    """Unsaved SiteSettings filled with the column defaults."""
+    values = {}
+    for column in SiteSettings.__table__.columns:
+        if column.default is not None:
+            arg = column.default.arg
+            values[column.key] = arg(None) if column.default.is_callable else arg
+    return SiteSettings(**values)
+
 
+async def get_site_settings(
+    db: AsyncSession, tenant_id: int, readonly: bool = False,
+) -> SiteSettings:
+    """Get the tenant's SiteSettings row, creating it if it doesn't exist.
 
-async def get_site_settings(db: AsyncSession) -> SiteSettings:
-    """Get the single SiteSettings row, creating it if it doesn't exist."""
-    result = await db.execute(select(SiteSettings).where(SiteSettings.id == 1))
+    With ``readonly=True`` (replica sessions) a missing row is not created;
+    an unsaved object with default values is returned instead.
+    """
+    result = await db.execute(select(SiteSettings).where(SiteSettings.tenant_id == tenant_id))
     settings = result.scalar_one_or_none()
 
+    if not settings and readonly:
+        return _default_site_settings()
     if not settings:
-        settings = SiteSettings(id=1)
+        settings = SiteSettings(tenant_id=tenant_id)
         db.add(settings)
         await db.flush()
         await db.refresh(settings)
 
     return settings
+
+
+async def get_cached_site_settings(
+    open_session: Callable, tenant: TenantInfo, fresh: bool = False,
+) -> SiteSettings:
+    """Read-only site settings for public pages, from the app cache.
+
+    Returns an unsaved SiteSettings; cached for CACHE_DEFAULT_TTL seconds and
+    dropped by the site tag purge that follows an admin settings change (only
+    if that purge reaches every worker). Concurrent misses share one query on
+    a session from ``open_session``; ``fresh=True`` (logged-in admins) reads
+    the database directly.
+    """
+    cache = get_cache()
+    use_cache = config.cache_reaches_all_workers
+    key = f"site_settings:{tenant.id}"
+    values = await cache.get(key) if use_cache and not fresh else None
+    if values is None:
+        async def load() -> dict:
+            async with open_session() as session:
+                site = await get_site_settings(session, tenant.id, readonly=True)
+                values = {c.key: getattr(site, c.key) for c in SiteSettings.__table__.columns}
+            if use_cache:
+                await cache.set(key, values, config.CACHE_DEFAULT_TTL, [site_tag(tenant)])
+            return values
+
+        values = await load() if fresh else await single_flight(key, load)
+    return SiteSettings(**values)
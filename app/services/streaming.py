@@ -0,0 +1,48 @@
+"""Stream query results as a JSON array or NDJSON from a server-side cursor.
+
+Rows arrive ``STREAM_CHUNK`` at a time; each chunk is serialized (including
+media URL resolution) and handed to the response before the next one is
+fetched, so memory stays bounded by the chunk size, not the catalog size.
+
+Streaming bodies run after the endpoint's dependencies have closed, so these
+generators open their own session via ``open_session`` (a zero-argument
+callable returning an async context manager). ``before_chunk``, if given, is
+awaited with ``(session, rows)`` before each chunk is serialized — the place
+to batch-load whatever the serializer needs for those rows.
+"""
+import json
+from collections.abc import AsyncIterator, Callable
+
+from sqlalchemy import Select
+
+STREAM_CHUNK = 500
+
+
+async def _serialized(
+    open_session: Callable, stmt: Select, serialize: Callable, before_chunk: Callable | None = None,
+) -> AsyncIterator[list[str]]:
+    async with open_session() as session:
+        result = await session.stream_scalars(stmt.execution_options(yield_per=STREAM_CHUNK))
+        async for rows in result.partitions():
+            if before_chunk is not None:
+                await before_chunk(session, rows)
+            yield [json.dumps(serialize(row), ensure_ascii=False) for row in rows]
+
+
+async def stream_json_array(
+    open_session: Callable, stmt: Select, serialize: Callable, before_chunk: Callable | None = None,
+) -> AsyncIterator[str]:
+    yield "["
+    sep = ""
+    async for items in _serialized(open_session, stmt, serialize, before_chunk):
+        if items:
+            yield sep + ",".join(items)
+            sep = ","
+    yield "]"
+
+
+async def stream_ndjson(
+    open_session: Callable, stmt: Select, serialize: Callable, before_chunk: Callable | None = None,
+) -> AsyncIterator[str]:
+    async for items in _serialized(open_session, stmt, serialize, before_chunk):
+        yield "".join(f"{item}\n" for item in items)
@@ -0,0 +1,116 @@
+"""Work gallery media (``work_media`` rows).
+
+Items are ordered by a sparse ``position`` (MEDIA_POSITION_STEP apart), so
+adding, moving or removing one item writes one row; only when two neighbours
+have no gap left is the work's gallery renumbered. ``first_media`` loads the
+first N items of many works in one query (window function) for list views,
+and ``key_references`` answers "which works use this key" from the key index.
+"""
+import uuid
+
+from sqlalchemy import func, literal, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.work import MEDIA_POSITION_STEP, Work, WorkMedia
+
+MAX_PREVIEW_MEDIA = 8
+
+
+async def first_media(
+    db: AsyncSession, work_ids: list[uuid.UUID], limit: int,
+) -> dict[uuid.UUID, list[WorkMedia]]:
+    """The first ``limit`` gallery items of each work, in one query."""
+    if not work_ids or limit <= 0:
+        return {}
+    ranked = (
+        select(
+            WorkMedia,
+            func.row_number().over(
+                partition_by=WorkMedia.work_id, order_by=WorkMedia.position,
+            ).label("rank"),
+        )
+        .where(WorkMedia.work_id.in_(work_ids))
+        .subquery()
+    )
+    item = aliased(WorkMedia, ranked)
+    result = await db.execute(
+        select(item).where(ranked.c.rank <= limit).order_by(item.work_id, item.position)
+    )
+    by_work: dict[uuid.UUID, list[WorkMedia]] = {}
+    for media in result.scalars():
+        by_work.setdefault(media.work_id, []).append(media)
+    return by_work
+
+
+async def _renumber(db: AsyncSession, work_id: uuid.UUID) -> None:
+    rank = func.row_number().over(order_by=WorkMedia.position)
+    ranked = (
+        select(WorkMedia.id, (rank * MEDIA_POSITION_STEP).label("pos"))
+        .where(WorkMedia.work_id == work_id)
+        .subquery()
+    )
+    await db.execute(
+        update(WorkMedia)
+        .where(WorkMedia.id == ranked.c.id)
+        .values(position=ranked.c.pos)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def position_at(
+    db: AsyncSession, work_id: uuid.UUID, index: int | None, exclude: uuid.UUID | None = None,
+) -> int:
+    """Position that places an item at ``index`` in the gallery (None: last).
+
+    ``exclude`` is the item being moved, which doesn't count as a neighbour.
+    """
+    others = [WorkMedia.work_id == work_id]
+    if exclude is not None:
+        others.append(WorkMedia.id != exclude)
+
+    async def after_last() -> int:
+        last = await db.scalar(select(func.max(WorkMedia.position)).where(*others))
+        return (last or 0) + MEDIA_POSITION_STEP
+
+    if index is None:
+        return await after_last()
+
+    for _ in range(2):
+        stmt = (
+            select(WorkMedia.position).where(*others)
+            .order_by(WorkMedia.position)
+            .offset(max(index - 1, 0)).limit(2)
+        )
+        around = (await db.scalars(stmt)).all()
+        if index == 0:
+            return around[0] - MEDIA_POSITION_STEP if around else MEDIA_POSITION_STEP
+        if len(around) < 2:  # at or past the end
+            return await after_last()
+        before, after = around
+        if after - before > 1:
+            return (before + after) // 2
+        await _renumber(db, work_id)  # no gap left: spread positions out, then retry
+    raise RuntimeError("gallery renumbering did not open a gap")
+
+
+async def touch_work(db: AsyncSession, work_id: uuid.UUID) -> None:
+    """Bump ``updated_at`` so caches keyed on it see the gallery change."""
+    await db.execute(
+        update(Work).where(Work.id == work_id).values(updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def key_references(db: AsyncSession, tenant_id: int, key: str) -> list[dict]:
+    """Works of the tenant that use ``key`` as cover or gallery item."""
+    covers = select(Work.id, Work.slug, literal("cover").label("role")).where(
+        Work.tenant_id == tenant_id, Work.cover_url == key,
+    )
+    gallery = (
+        select(Work.id, Work.slug, literal("gallery").label("role"))
+        .join(WorkMedia, WorkMedia.work_id == Work.id)
+        .where(Work.tenant_id == tenant_id, WorkMedia.key == key)
+    )
+    result = await db.execute(union_all(covers, gallery))
+    return [{"work_id": row.id, "slug": row.slug, "role": row.role} for row in result]
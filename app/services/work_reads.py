@@ -0,0 +1,136 @@
+"""Public work reads shared by the pages and the works API.
+
+Work details by slug and short work lists (by tag, sort and preview media)
+come from the app cache when an admin write's invalidation reaches every
+worker (``settings.cache_reaches_all_workers``: a shared backend, or a single
+worker); otherwise they are read from the database. Misses are coalesced
+with ``single_flight`` either way, so a burst of requests for the same work
+or list runs one query on one pooled connection.
+
+Results are plain dicts holding media keys, not URLs: callers resolve URLs
+per response. Cached entries are tagged with the CDN surrogate keys, so the
+admin write hooks drop them.
+
+Loaders open their own session through ``open_session`` (a zero-argument
+callable returning an async context manager, see ``read_session``): the
+shared computation must not depend on one caller's request-scoped session.
+``fresh=True`` (logged-in admins) skips both the cache and loads in flight.
+"""
+from collections.abc import Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache import MISSING, get_cache
+from app.core.config import get_settings
+from app.core.singleflight import single_flight
+from app.models.analytics import WorkViewCount
+from app.models.work import Work
+from app.schemas.tenant import TenantInfo
+from app.schemas.work import WorkDetail, WorkListItem, WorkMediaItem
+from app.services.cdn import site_tag, work_tag
+from app.services.streaming import STREAM_CHUNK
+from app.services.work_media import first_media
+
+settings = get_settings()
+
+LIST_MAX_ITEMS = STREAM_CHUNK  # longer lists are streamed, not coalesced
+
+
+def list_stmt(tenant: TenantInfo, tag: str | None, sort: str):
+    stmt = select(Work).where(Work.tenant_id == tenant.id)
+    if sort == "popular":
+        popularity = func.coalesce(WorkViewCount.views + WorkViewCount.clicks, 0)
+        stmt = (
+            stmt.outerjoin(WorkViewCount, WorkViewCount.work_id == Work.id)
+            .order_by(popularity.desc(), Work.sort_order, Work.created_at.desc())
+        )
+    else:
+        stmt = stmt.order_by(Work.sort_order, Work.created_at.desc())
+    if tag:
+        stmt = stmt.where(Work.tags.any(tag))
+    return stmt
+
+
+def list_item(work: Work, with_media: bool = False) -> dict:
+    item = WorkListItem.model_validate(work).model_dump(mode="json")
+    if with_media:
+        item["media"] = [WorkMediaItem.model_validate(m).model_dump(mode="json") for m in work.media]
+    return item
+
+
+async def attach_first_media(session, works: list[Work], limit: int) -> None:
+    """Load the first ``limit`` gallery items of ``works`` (one query) into ``work.media``."""
+    by_work = await first_media(session, [w.id for w in works], limit)
+    for work in works:
+        set_committed_value(work, "media", by_work.get(work.id, []))
+
+
+async def work_details(
+    open_session: Callable, tenant: TenantInfo, slugs: list[str], fresh: bool = False,
+) -> dict[str, dict]:
+    """Detail dicts (``WorkDetail`` fields, media keys unresolved) by slug;
+    unknown slugs are left out."""
+    cache = get_cache()
+    use_cache = settings.cache_reaches_all_workers
+    keys = {slug: f"work:{tenant.id}:{slug}" for slug in slugs}
+    cached = await cache.get_many(keys.values()) if use_cache and not fresh else {}
+    details = {slug: cached[key] for slug, key in keys.items() if key in cached}
+    missing = sorted(slug for slug in slugs if slug not in details)
+    if not missing:
+        return details
+
+    async def load() -> dict[str, dict]:
+        async with open_session() as session:
+            result = await session.execute(
+                select(Work).where(Work.tenant_id == tenant.id, Work.slug.in_(missing))
+                .options(selectinload(Work.media))
+            )
+            loaded = {w.slug: WorkDetail.model_validate(w).model_dump(mode="json") for w in result.scalars()}
+        if use_cache:
+            for slug, detail in loaded.items():
+                await cache.set(
+                    keys[slug], detail, settings.CACHE_DEFAULT_TTL,
+                    [site_tag(tenant), work_tag(tenant, slug)],
+                )
+        return loaded
+
+    if fresh:
+        return details | await load()
+    return details | await single_flight(f"work:{tenant.id}:{','.join(missing)}", load)
+
+
+async def work_list(
+    open_session: Callable, tenant: TenantInfo, tag: str | None, sort: str, media: int = 0,
+    fresh: bool = False,
+) -> list[dict] | None:
+    """List items (media keys unresolved), or None if the list is longer than
+    LIST_MAX_ITEMS and should be streamed instead.
+
+    Lists with preview media are coalesced but not cached: gallery edits only
+    purge the work's own tag.
+    """
+    cache = get_cache()
+    use_cache = settings.cache_reaches_all_workers and not media
+    key = f"works:{tenant.id}:{sort}:{media}:{tag or ''}"
+    if use_cache and not fresh:
+        items = await cache.get(key, MISSING)
+        if items is not MISSING:
+            return items
+
+    async def load() -> list[dict] | None:
+        async with open_session() as session:
+            result = await session.execute(list_stmt(tenant, tag, sort).limit(LIST_MAX_ITEMS + 1))
+            works = result.scalars().all()
+            if len(works) > LIST_MAX_ITEMS:
+                items = None
+            else:
+                if media:
+                    await attach_first_media(session, works, media)
+                items = [list_item(w, with_media=bool(media)) for w in works]
+        if use_cache:
+            await cache.set(key, items, settings.CACHE_DEFAULT_TTL, [site_tag(tenant)])
+        return items
+
+    return await load() if fresh else await single_flight(key, load)
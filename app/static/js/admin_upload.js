@@ -33,6 +33,29 @@ async function uploadFile(file, folder) {
   return public_url;
 }
 
+// Whole selection in one request; the server pushes files to the bucket in parallel.
+async function uploadFiles(files, folder) {
+  statusEl.textContent = `Uploading ${files.length} file(s)...`;
+  statusEl.className = 'form-status';
+
+  const formData = new FormData();
+  files.forEach(file => formData.append('files', file));
+  formData.append('folder', folder);
+
+  const res = await fetch('/api/admin/upload/batch', {
+    method: 'POST',
+    body: formData,
+  });
+
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || 'Upload failed');
+  }
+
+  statusEl.textContent = '';
+  return res.json();
+}
+
 // ============ COVER UPLOAD ============
 const coverInput = document.getElementById('coverInput');
 const coverZone = document.getElementById('coverZone');
@@ -84,23 +107,32 @@ const galleryPreviews = document.getElementById('galleryPreviews');
 galleryInput.addEventListener('change', async (e) => {
   const files = Array.from(e.target.files);
   if (!files.length) return;
-  for (const file of files) {
-    try {
-      const slug = document.getElementById('slug').value || 'draft';
-      const url = await uploadFile(file, `works/${slug}/gallery/`);
-      galleryUrls.push(url);
+  const slug = document.getElementById('slug').value || 'draft';
+  try {
+    const results = await uploadFiles(files, `works/${slug}/gallery/`);
+    const failed = [];
+    results.forEach((result, i) => {
+      if (!result.ok) {
+        failed.push(`${result.filename}: ${result.error}`);
+        return;
+      }
+      galleryUrls.push(result.public_url);
       const thumb = document.createElement('div');
       thumb.className = 'gallery-thumb';
-      thumb.dataset.url = url;
+      thumb.dataset.url = result.public_url;
       thumb.innerHTML = `
-        <img src="${URL.createObjectURL(file)}" alt="Gallery image">
+        <img src="${URL.createObjectURL(files[i])}" alt="Gallery image">
         <button type="button" class="remove-btn" onclick="removeGalleryImage(this)">×</button>
       `;
       galleryPreviews.appendChild(thumb);
-    } catch (err) {
-      statusEl.textContent = `Failed: ${file.name}: ${err.message}`;
+    });
+    if (failed.length) {
+      statusEl.textContent = `Failed: ${failed.join('; ')}`;
       statusEl.className = 'form-status error';
     }
+  } catch (err) {
+    statusEl.textContent = err.message;
+    statusEl.className = 'form-status error';
   }
   galleryInput.value = '';
 });
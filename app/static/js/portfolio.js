@@ -32,10 +32,75 @@ document.querySelectorAll('#mainNav a[data-section]').forEach(link => {
   });
 });
 
+// ============ PREFETCH CACHE ============
+// Work details are fetched in batches before the click (hover, focus or
+// scrolling near the item) and kept for a few minutes, since the media URLs
+// they contain may be presigned and expire.
+const PREFETCH_TTL = 5 * 60 * 1000;
+const PREFETCH_BATCH = 24;
+const PREFETCH_DELAY = 50;
+const workCache = new Map();  // slug -> { promise, at }
+const prefetchQueue = new Set();
+let prefetchTimer = null;
+
+function cachedWork(slug) {
+  const entry = workCache.get(slug);
+  if (entry && Date.now() - entry.at < PREFETCH_TTL) return entry.promise;
+  workCache.delete(slug);
+  return null;
+}
+
+function prefetchWork(slug) {
+  if (cachedWork(slug) || prefetchQueue.has(slug)) return;
+  prefetchQueue.add(slug);
+  clearTimeout(prefetchTimer);
+  prefetchTimer = setTimeout(flushPrefetch, PREFETCH_DELAY);
+}
+
+function flushPrefetch() {
+  const slugs = Array.from(prefetchQueue).slice(0, PREFETCH_BATCH);
+  slugs.forEach(s => prefetchQueue.delete(s));
+  if (prefetchQueue.size) prefetchTimer = setTimeout(flushPrefetch, PREFETCH_DELAY);
+  if (!slugs.length) return;
+
+  const batch = fetch(`/api/works/batch?slugs=${slugs.map(encodeURIComponent).join(',')}`)
+    .then(res => (res.ok ? res.json() : []))
+    .catch(() => []);
+  const at = Date.now();
+  slugs.forEach(slug => {
+    workCache.set(slug, { promise: batch.then(list => list.find(w => w.slug === slug) || null), at });
+  });
+}
+
+async function loadWork(slug) {
+  const cached = await cachedWork(slug);
+  if (cached) return cached;
+  const res = await fetch(`/api/works/${slug}`);
+  if (!res.ok) return null;
+  const art = await res.json();
+  workCache.set(slug, { promise: Promise.resolve(art), at: Date.now() });
+  return art;
+}
+
+const prefetchObserver = 'IntersectionObserver' in window
+  ? new IntersectionObserver((entries) => {
+      entries.forEach(entry => {
+        if (!entry.isIntersecting) return;
+        prefetchWork(entry.target.dataset.slug);
+        prefetchObserver.unobserve(entry.target);
+      });
+    }, { rootMargin: '200px' })
+  : null;
+
 // ============ GRID ITEM CLICKS ============
 document.querySelectorAll('.grid-item[data-slug]').forEach(item => {
   const slug = item.dataset.slug;
 
+  item.addEventListener('mouseenter', () => prefetchWork(slug));
+  item.addEventListener('focus', () => prefetchWork(slug));
+  item.addEventListener('touchstart', () => prefetchWork(slug), { passive: true });
+  if (prefetchObserver) prefetchObserver.observe(item);
+
   item.addEventListener('click', () => openArtwork(slug));
   item.addEventListener('keydown', (e) => {
     if (e.key === 'Enter' || e.key === ' ') {
@@ -45,12 +110,22 @@ document.querySelectorAll('.grid-item[data-slug]').forEach(item => {
   });
 });
 
-// ============ OPEN ARTWORK (fetch from API) ============
+// ============ OPEN ARTWORK (prefetched or fetched from API) ============
+function sendClick(slug) {
+  const url = `/api/works/${encodeURIComponent(slug)}/click`;
+  if (navigator.sendBeacon && navigator.sendBeacon(url)) return;
+  fetch(url, { method: 'POST', keepalive: true }).catch(() => {});
+}
+
 async function openArtwork(slug) {
+  sendClick(slug);
   try {
-    const res = await fetch(`/api/works/${slug}`);
-    if (!res.ok) return;
-    const art = await res.json();
+    const art = await loadWork(slug);
+    if (!art) {
+      // Pre-rendered deployments may not expose the API; use the static page
+      window.location.href = `/work/${slug}`;
+      return;
+    }
 
     document.getElementById('detailImg').src = art.cover_url || '';
     document.getElementById('detailImg').alt = art.title;
@@ -75,6 +150,36 @@ async function openArtwork(slug) {
       });
     }
 
+    // Related works (precomputed server-side)
+    const related = document.getElementById('detailRelated');
+    const relatedGrid = document.getElementById('detailRelatedGrid');
+    if (related && relatedGrid) {
+      relatedGrid.innerHTML = '';
+      (art.related || []).forEach(r => {
+        const link = document.createElement('a');
+        link.className = 'related-item';
+        link.href = `/work/${r.slug}`;
+        if (r.cover_url) {
+          const img = document.createElement('img');
+          img.src = r.cover_url;
+          img.alt = r.title;
+          img.loading = 'lazy';
+          link.appendChild(img);
+        }
+        const title = document.createElement('span');
+        title.className = 'related-title';
+        title.textContent = r.year ? `${r.title}, ${r.year}` : r.title;
+        link.appendChild(title);
+        link.addEventListener('mouseenter', () => prefetchWork(r.slug));
+        link.addEventListener('click', (e) => {
+          e.preventDefault();
+          openArtwork(r.slug);
+        });
+        relatedGrid.appendChild(link);
+      });
+      related.hidden = !relatedGrid.children.length;
+    }
+
     // Hide all sections, show detail
     document.querySelectorAll('.page-section').forEach(s => s.classList.remove('visible'));
     const detail = document.getElementById('artwork-detail');
@@ -0,0 +1,69 @@
+"""
+Export / import a portfolio as NDJSON (works + site settings).
+Usage:
+    python -m scripts.portfolio_io export > portfolio.ndjson
+    python -m scripts.portfolio_io import portfolio.ndjson   # or "-" for stdin
+    python -m scripts.portfolio_io --tenant anna export      # non-default tenant
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Allow running as script from scripts start directory
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.database import async_session_factory
+from app.core.tenancy import get_tenant_by_slug
+from app.services.portfolio_io import export_ndjson, import_ndjson
+
+
+async def _tenant_id(slug: str) -> int:
+    tenant = await get_tenant_by_slug(slug)
+    if tenant is None:
+        sys.exit(f"✗ Unknown tenant: {slug}")
+    return tenant.id
+
+
+async def export(slug: str, out) -> None:
+    tenant_id = await _tenant_id(slug)
+    async with async_session_factory() as session:
+        async for chunk in export_ndjson(session, tenant_id):
+            out.write(chunk)
+    out.flush()
+
+
+async def _file_lines(f):
+    for line in f:
+        yield line
+
+
+async def import_(slug: str, f) -> None:
+    tenant_id = await _tenant_id(slug)
+    async with async_session_factory() as session:
+        counts = await import_ndjson(session, tenant_id, _file_lines(f))
+        await session.commit()
+    print(f"✓ Imported {counts['works']} works, {counts['site_settings']} settings rows", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant", default="default", help="tenant slug (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="write NDJSON to stdout")
+    imp = sub.add_parser("import", help="upsert from an NDJSON file")
+    imp.add_argument("path", help='NDJSON file, or "-" for stdin')
+    args = parser.parse_args()
+
+    if args.command == "export":
+        asyncio.run(export(args.tenant, sys.stdout))
+    elif args.path == "-":
+        asyncio.run(import_(args.tenant, sys.stdin))
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            asyncio.run(import_(args.tenant, f))
+
+
+if __name__ == "__main__":
+    main()
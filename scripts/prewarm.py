@@ -0,0 +1,58 @@
+"""
+Pre-warm caches after a deploy, worker restart or publish: requests "/", every
+"/work/{slug}" and "/api/works" (plus one per tag) and prints per-URL timings.
+Usage:
+    python -m scripts.prewarm                                   # in-process (DB, presign warm-up)
+    python -m scripts.prewarm --base-url https://example.com    # over HTTP: CDN + workers
+    python -m scripts.prewarm --all --concurrency 8             # every active tenant
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Allow running as script from scripts start directory
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.tenancy import get_tenant_by_slug
+from app.services.prewarm import make_client, prewarm_tenant, served_tenants, summary_line
+
+
+async def main(slug: str, all_tenants: bool, base_url: str | None, concurrency: int | None) -> int:
+    if all_tenants:
+        tenants = await served_tenants()
+    else:
+        tenant = await get_tenant_by_slug(slug)
+        if tenant is None:
+            sys.exit(f"✗ Unknown tenant: {slug}")
+        tenants = [tenant]
+
+    app = None
+    if base_url is None:
+        from app.main import app
+
+    failed = 0
+    async with make_client(app, base_url) as client:
+        for tenant in tenants:
+            try:
+                report = await prewarm_tenant(client, tenant, concurrency=concurrency)
+            except ValueError as exc:
+                print(f"✗ Skipped {tenant.slug}: {exc}")
+                failed += 1
+                continue
+            for url in report["urls"]:
+                print(f"  {url['status'] or 'ERR':>3} {url['ms']:>8.1f}ms  {url['path']}")
+            print(summary_line(tenant, report))
+            failed += report["failed"]
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant", default="default", help="tenant slug (default: %(default)s)")
+    parser.add_argument("--all", action="store_true", help="prewarm every tenant this deployment serves")
+    parser.add_argument("--base-url", help="request over HTTP (e.g. the CDN URL) instead of in-process")
+    parser.add_argument("--concurrency", type=int, help="parallel requests (default: PREWARM_CONCURRENCY)")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.tenant, args.all, args.base_url, args.concurrency)) else 0)
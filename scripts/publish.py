@@ -0,0 +1,60 @@
+"""
+Pre-render the public site and upload changed files to the bucket.
+Usage:
+    python -m scripts.publish                  # default tenant
+    python -m scripts.publish --tenant anna
+    python -m scripts.publish --all            # every active tenant
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Allow running as script from scripts start directory
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import get_settings
+from app.core.database import async_session_factory
+from app.core.tenancy import get_tenant_by_slug, list_active_tenants
+from app.schemas.tenant import TenantInfo
+from app.services.publisher import PublishError, publish_site, site_prefix
+
+settings = get_settings()
+
+
+async def publish(tenant: TenantInfo):
+    async with async_session_factory() as session:
+        try:
+            summary = await publish_site(session, tenant)
+        except PublishError as exc:
+            sys.exit(f"✗ Publish failed ({tenant.slug}): {exc}")
+    prefix = site_prefix(tenant)
+    for key in summary["uploaded"]:
+        print(f"  ↑ {prefix}{key}")
+    for key in summary["deleted"]:
+        print(f"  - {prefix}{key}")
+    print(
+        f"✓ Publish complete ({tenant.slug}): {len(summary['uploaded'])} uploaded, "
+        f"{len(summary['deleted'])} deleted, {summary['unchanged']} unchanged"
+    )
+
+
+async def main(slug: str, all_tenants: bool):
+    if all_tenants:
+        tenants = await list_active_tenants()
+    else:
+        tenant = await get_tenant_by_slug(slug)
+        if tenant is None:
+            sys.exit(f"✗ Unknown tenant: {slug}")
+        tenants = [tenant]
+    for tenant in tenants:
+        await publish(tenant)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant", default="default", help="tenant slug (default: %(default)s)")
+    parser.add_argument("--all", action="store_true", help="publish every active tenant")
+    args = parser.parse_args()
+    asyncio.run(main(args.tenant, args.all))
@@ -0,0 +1,81 @@
+"""
+Release step — run once per deploy, before the web workers start.
+Applies pending migrations (skipped quickly when the DB is already at head)
+and seeds the admin user if it doesn't exist yet.
+Usage: python -m scripts.release
+"""
+import asyncio
+import sys
+import os
+import time
+
+# Allow running as script from scripts start directory
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import pool, select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+async def _current_revisions() -> set[str]:
+    engine = create_async_engine(settings.async_database_url, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return set(result.scalars().all())
+    except ProgrammingError:  # fresh database: no alembic_version table yet
+        return set()
+    finally:
+        await engine.dispose()
+
+
+async def _seed_admin() -> None:
+    from app.core.security import hash_password
+    from app.models.tenant import DEFAULT_TENANT_ID
+    from app.models.user import AdminUser
+
+    engine = create_async_engine(settings.async_database_url, poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as conn:
+            stmt = select(AdminUser.id).where(
+                AdminUser.tenant_id == DEFAULT_TENANT_ID,
+                AdminUser.email == settings.ADMIN_EMAIL,
+            )
+            if (await conn.execute(stmt)).first():
+                print(f"✓ Admin user exists: {settings.ADMIN_EMAIL}")
+                return
+            await conn.execute(AdminUser.__table__.insert().values(
+                tenant_id=DEFAULT_TENANT_ID,
+                email=settings.ADMIN_EMAIL,
+                password_hash=hash_password(settings.ADMIN_PASSWORD),
+                is_active=True,
+            ))
+            print(f"✓ Seeded admin user: {settings.ADMIN_EMAIL}")
+    finally:
+        await engine.dispose()
+
+
+def release() -> None:
+    started = time.perf_counter()
+    cfg = Config("alembic.ini")
+    heads = set(ScriptDirectory.from_config(cfg).get_heads())
+
+    if asyncio.run(_current_revisions()) == heads:
+        print(f"✓ Database already at head ({', '.join(sorted(heads))})")
+    else:
+        command.upgrade(cfg, "head")
+
+    asyncio.run(_seed_admin())
+    print(f"✓ Release complete in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    release()
@@ -11,11 +11,13 @@ if __name__ == "__main__" and __package__ is None:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.core.config import get_settings
 from app.core.database import async_session_factory, engine
 from app.core.security import hash_password
-from app.models import Base, AdminUser, Work
+from app.models import Base, AdminUser, Tenant, Work
+from app.models.tenant import DEFAULT_TENANT_ID
 
 settings = get_settings()
 
@@ -35,27 +37,43 @@ async def seed():
         await conn.run_sync(Base.metadata.create_all)
 
     async with async_session_factory() as session:
+        # Default tenant (the migration creates it; create_all doesn't)
+        await session.execute(
+            pg_insert(Tenant.__table__)
+            .values(id=DEFAULT_TENANT_ID, slug="default", name="", bucket_prefix="", is_active=True)
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+
         # Admin user
-        result = await session.execute(select(AdminUser).where(AdminUser.email == settings.ADMIN_EMAIL))
+        result = await session.execute(select(AdminUser).where(
+            AdminUser.tenant_id == DEFAULT_TENANT_ID, AdminUser.email == settings.ADMIN_EMAIL,
+        ))
         if not result.scalar_one_or_none():
             session.add(AdminUser(
+                tenant_id=DEFAULT_TENANT_ID,
                 email=settings.ADMIN_EMAIL,
                 password_hash=hash_password(settings.ADMIN_PASSWORD),
                 is_active=True,
             ))
             print(f"✓ Created admin: {settings.ADMIN_EMAIL}")
 
-        # Demo works
-        for w in DEMO_WORKS:
-            existing = await session.execute(select(Work).where(Work.slug == w["slug"]))
-            if not existing.scalar_one_or_none():
-                session.add(Work(
+        # Demo works — one INSERT, existing slugs are left alone
+        stmt = (
+            pg_insert(Work.__table__)
+            .values([
+                {
                     **w,
-                    description="Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
-                    cover_url="",  # Set via admin upload
-                    gallery_urls=[],
-                ))
-                print(f"  + Work: {w['slug']}")
+                    "tenant_id": DEFAULT_TENANT_ID,
+                    "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+                    "cover_url": "",  # Set via admin upload
+                }
+                for w in DEMO_WORKS
+            ])
+            .on_conflict_do_nothing(index_elements=["tenant_id", "slug"])
+            .returning(Work.slug)
+        )
+        for slug in (await session.execute(stmt)).scalars():
+            print(f"  + Work: {slug}")
 
         await session.commit()
         print("✓ Seed complete")
@@ -0,0 +1,97 @@
+"""
+Manage tenants (portfolios served from this deployment, see MULTI_TENANT).
+Usage:
+    python -m scripts.tenants list
+    python -m scripts.tenants create anna --name "Anna K." --host anna.art \\
+        --admin-email anna@example.com --admin-password s3cret
+    python -m scripts.tenants disable anna
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Allow running as script from scripts start directory
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import async_session_factory
+from app.core.security import hash_password
+from app.core.tenancy import TENANT_SLUG_RE, normalize_host, tenant_key_prefix
+from app.models import AdminUser, SiteSettings, Tenant
+
+
+
+async def list_tenants() -> None:
+    async with async_session_factory() as session:
+        result = await session.execute(select(Tenant).order_by(Tenant.id))
+        for t in result.scalars():
+            state = "" if t.is_active else "  (disabled)"
+            print(f"{t.id:>5}  {t.slug:<24} {t.host or '-':<32} {t.bucket_prefix or '-'}{state}")
+
+
+async def create_tenant(args) -> None:
+    if not TENANT_SLUG_RE.match(args.slug):
+        sys.exit("✗ Slug must be a DNS label: a-z 0-9 and hyphens, max 63 chars")
+    async with async_session_factory() as session:
+        tenant = Tenant(
+            slug=args.slug,
+            name=args.name or args.slug,
+            host=normalize_host(args.host) if args.host else None,
+            bucket_prefix=tenant_key_prefix(args.slug),
+            is_active=True,
+        )
+        session.add(tenant)
+        try:
+            await session.flush()
+        except IntegrityError:
+            sys.exit(f"✗ Tenant slug or host already taken: {args.slug} / {args.host}")
+        session.add(SiteSettings(tenant_id=tenant.id, artist_name=tenant.name))
+        session.add(AdminUser(
+            tenant_id=tenant.id,
+            email=args.admin_email,
+            password_hash=hash_password(args.admin_password),
+            is_active=True,
+        ))
+        await session.commit()
+    print(f"✓ Created tenant {args.slug} (id {tenant.id}), admin {args.admin_email}")
+
+
+async def set_active(slug: str, active: bool) -> None:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            update(Tenant).where(Tenant.slug == slug).values(is_active=active)
+        )
+        await session.commit()
+    if not result.rowcount:
+        sys.exit(f"✗ Unknown tenant: {slug}")
+    print(f"✓ Tenant {slug} {'enabled' if active else 'disabled'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list all tenants")
+    create = sub.add_parser("create", help="create a tenant with its first admin user")
+    create.add_argument("slug")
+    create.add_argument("--name", default="")
+    create.add_argument("--host", default="", help="custom domain, e.g. anna.art")
+    create.add_argument("--admin-email", required=True)
+    create.add_argument("--admin-password", required=True)
+    for name in ("enable", "disable"):
+        sub.add_parser(name, help=f"{name} a tenant").add_argument("slug")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        asyncio.run(list_tenants())
+    elif args.command == "create":
+        asyncio.run(create_tenant(args))
+    else:
+        asyncio.run(set_active(args.slug, args.command == "enable"))
+
+
+if __name__ == "__main__":
+    main()